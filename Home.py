@@ -1,9 +1,13 @@
 import streamlit as st
 from utils.helper_functions import render_markdown_from_file
 from utils.helper_functions import render_global_toolbar
+from app_state import start_cache_warmup
 
 st.set_page_config(layout="wide")
 
+# Precompute every fund's backtests in the background so the other pages only read cached results
+start_cache_warmup()
+
 # Title centered above
 # st.markdown("<h1 style='text-align: center;'>Querido Capital Management</h1>", unsafe_allow_html=True)
 
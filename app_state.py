@@ -1,74 +1,183 @@
+import os
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+import pandas as pd
 import streamlit as st
 from datasets.GetSeries import GetSeries
-from simulation.StrategyExecution import main as run_backtest
-from strategies.InitialiseStrategy import InitialiseStrategy
-from strategies.signal_generation.BuyAndHoldStrategy import BuyAndHoldStrategy
-from strategies.signal_generation.MeanReversionStrategy import MeanReversionStrategy
-from strategies.allocations.EqualWeightAllocator import EqualWeightAllocator
+from datasets.SecurityMetadata import SecurityMetadata
+from simulation.StrategyExecution import run_engine, run_benchmark, benchmark_key, results_key, fund_key, build_stats
+from simulation.BenchmarkCache import BenchmarkCache
+from simulation.ResultsStore import ResultsStore
+from stats.FactorRiskModel import FactorRiskModel
+from stats.BrinsonAttribution import BrinsonAttribution
+from simulation.CacheWarmup import CacheWarmup, fund_backtests, COSTS, BENCHMARK_TICKER
 from utils.helper_functions import build_fund_registry
-from strategies.StrategyEnsemble import StrategyEnsemble
+
+
+def warmup_workers():
+    # QAM_CACHE_WARMUP=0 turns the in-app warm-up off, e.g. when it runs as a separate scheduled process
+    if os.environ.get("QAM_CACHE_WARMUP", "1") == "0":
+        return 0
+    return max(1, (os.cpu_count() or 4) // 4)
+
+
+@st.cache_resource
+def get_backtest_pool():
+    # Spawned rather than forked, the Streamlit server is multi-threaded. Shares the cores with the warm-up pool.
+    return ProcessPoolExecutor(
+        max_workers=max(1, (os.cpu_count() or 4) - warmup_workers()), mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+@st.cache_resource
+def start_cache_warmup():
+    # Once per server process, on a small pool of its own so page requests aren't queued behind it.
+    # Warms again after every midnight so the toolbar's default range, which ends today, is always ready.
+    if not warmup_workers():
+        return None
+    warmup = CacheWarmup(max_workers=warmup_workers())
+    thread = threading.Thread(target=warmup.run_daily, name="cache-warmup", daemon=True)
+    thread.start()
+    return thread
+
 
 @st.cache_data(show_spinner=True)
 def get_performance_stats(fund, start_date, end_date):
-    fund_components = build_fund_registry(start_date, end_date)[fund]
+    registry = build_fund_registry(start_date, end_date)
+    costs = COSTS
+    store = ResultsStore()
 
-    individual_stats = {}
+    # A fund computed before is read back by its config alone, without building its strategies
+    manifest_key = fund_key(registry.fingerprint(fund), start_date, end_date, **costs)
+    manifest = store.get_manifest(manifest_key)
+    if manifest is not None:
+        stats = stored_fund_stats(store, manifest)
+        if stats is not None:
+            return stats
+
+    fund_components = registry[fund]
+    pool = get_backtest_pool()
 
-    for name, (strat, weight) in fund_components.capital_allocation.items():
-        tickers = strat.tickers if hasattr(strat, "tickers") else []  # get tickers from strat
-
-        stats = run_backtest(       # Todo Merge this into the running of the main backtest
-            tickers=tickers,
-            strat=strat,
-            benchmark_ticker="SPY",
-            benchmark_strat=InitialiseStrategy(
-                strategy_cls=MeanReversionStrategy,
-                allocator_cls=EqualWeightAllocator,
-                tickers=["SPY"],
-                start=start_date,
-                end=end_date,
-                strategy_kwargs={"lookback": 20, "bound": 1.5},
-                allocator_kwargs={}
-            ),
-            start_date=start_date,
-            end_date=end_date,
-            slippage=0.001,
-            commission=0.0005
-        )
-        individual_stats[name] = stats
+    benchmark_runs = {}  # {benchmark key: future or cached returns}, each distinct benchmark runs once
+
+    def submit_benchmark(benchmark_strat):
+        key = benchmark_key(BENCHMARK_TICKER, benchmark_strat, start_date, end_date, **costs)
+        if key not in benchmark_runs:
+            cached = BenchmarkCache().get(key)
+            benchmark_runs[key] = cached if cached is not None else \
+                pool.submit(run_benchmark, BENCHMARK_TICKER, benchmark_strat, start_date, end_date, **costs)
+        return key
+
+    def benchmark_returns(key):
+        run = benchmark_runs[key]
+        if isinstance(run, Future):
+            benchmark_runs[key] = run.result()
+            BenchmarkCache().put(key, benchmark_runs[key], persist=False)  # The worker has already written it to disk
+        return benchmark_runs[key]
+
+    def submit_run(tickers, strat):
+        # Stored runs are read here, only runs never computed before go to the pool
+        key = results_key(tickers, strat, start_date, end_date, **costs)
+        stored = store.get(key)
+        return key, stored if stored is not None else pool.submit(run_engine, tickers, strat, start_date, end_date, **costs)
+
+    def run_results(run):
+        return run.result() if isinstance(run, Future) else run
+
+    # Every strategy, composite and benchmark backtest is independent, so schedule them all up front
+    backtests = fund_backtests(fund_components, start_date, end_date)
+    strategy_runs, strategy_bmk_keys = {}, {}
+    for name, (tickers, strat, benchmark_strat) in backtests["strategies"].items():
+        strategy_runs[name] = submit_run(tickers, strat)
+        strategy_bmk_keys[name] = submit_benchmark(benchmark_strat)
 
     # Composite strategy
-    capital_allocation = {
-        name: (strat, weight) for name, (strat, weight) in fund_components.capital_allocation.items()
+    all_tickers, ensemble, benchmark = backtests["composite"]
+    print('Ensemble Weights:', ensemble.aggregate_allocations())
+    composite_run = submit_run(all_tickers, ensemble)
+    composite_bmk_key = submit_benchmark(benchmark)
+
+    # Gather into stats once every run has finished
+    individual_stats = {}
+    for name, (key, run) in strategy_runs.items():
+        returns, _, trades_df, positions_df = run_results(run)
+        individual_stats[name] = build_stats(returns, benchmark_returns(strategy_bmk_keys[name]), trades_df, positions_df)
+
+    key, run = composite_run
+    returns, _, trades_df, positions_df = run_results(run)
+    composite_stats = build_stats(returns, benchmark_returns(composite_bmk_key), trades_df, positions_df)
+
+    store.put_manifest(manifest_key, {
+        "composite": [key, composite_bmk_key],
+        "strategies": {name: [key, strategy_bmk_keys[name]] for name, (key, _) in strategy_runs.items()},
+    })
+    return {
+        "composite": composite_stats,
+        "strategies": individual_stats
     }
-    all_tickers = sorted(set(
-        t
-        for strat, _ in fund_components.capital_allocation.values()
-        for t in strat.tickers
-    ))
 
-    ensemble = StrategyEnsemble(capital_allocation)
-    print('Ensemble Weights:', ensemble.aggregate_allocations())
 
-    benchmark = InitialiseStrategy(
-        strategy_cls=BuyAndHoldStrategy,
-        allocator_cls=EqualWeightAllocator,
-        tickers="SPY",
-        start=start_date,
-        end=end_date
-    )
-    composite_stats = run_backtest(
-        all_tickers,        # Todo: Use the tickers from the underlying strategies
-        ensemble,
-        benchmark_ticker="SPY",
-        benchmark_strat=benchmark,
-        start_date=start_date,
-        end_date=end_date,
-        slippage=0.001,
-        commission=0.0005
-    )
+def stored_fund_stats(store, manifest):
+    """
+    get_performance_stats' output rebuilt from the runs a fund manifest names, None if any has been cleared.
+    """
+    benchmarks = BenchmarkCache()
 
+    def stored_stats(key, bmk_key):
+        results, bmk_returns = store.get(key), benchmarks.get(bmk_key)
+        if results is None or bmk_returns is None:
+            return None
+        returns, _, trades_df, positions_df = results
+        return build_stats(returns, bmk_returns, trades_df, positions_df)
+
+    individual_stats = {name: stored_stats(*keys) for name, keys in manifest["strategies"].items()}
+    composite_stats = stored_stats(*manifest["composite"])
+    if composite_stats is None or any(stats is None for stats in individual_stats.values()):
+        return None
     return {
         "composite": composite_stats,
         "strategies": individual_stats
     }
+
+
+@st.cache_data(show_spinner=True)
+def get_risk_decomposition(fund, start_date, end_date, strategy=None, basis="Portfolio"):
+    """
+    Daily factor risk decomposition for the fund composite, or one of its strategies, against SPY.
+    basis: "Portfolio", "Benchmark" or "Contribution to TE" (active weights).
+    """
+    all_stats = get_performance_stats(fund, start_date, end_date)
+    stats = all_stats["strategies"][strategy] if strategy else all_stats["composite"]
+    model = FactorRiskModel.shared(fund_universe(fund, start_date, end_date), start_date, end_date)
+
+    portfolio = stats.episodes.weights
+    benchmark = pd.DataFrame({"SPY": 1.0}, index=model.dates)
+    weights = {
+        "Portfolio": portfolio,
+        "Benchmark": benchmark,
+        "Contribution to TE": portfolio.reindex(index=model.dates, columns=model.tickers).ffill().fillna(0.0)
+        .sub(benchmark.reindex(columns=model.tickers).fillna(0.0)),
+    }[basis]
+    return model.decompose(weights)
+
+
+def fund_universe(fund, start_date, end_date):
+    # Every ticker any of the fund's strategies trades, plus the SPY benchmark, read from the config alone
+    return sorted(set(build_fund_registry(start_date, end_date).tickers(fund)) | {BENCHMARK_TICKER})
+
+
+@st.cache_data(show_spinner=True)
+def get_brinson_attribution(fund, start_date, end_date, strategy=None, grouping="Sector"):
+    """
+    Brinson attribution of the fund composite, or one of its strategies, against SPY.
+    """
+    all_stats = get_performance_stats(fund, start_date, end_date)
+    stats = all_stats["strategies"][strategy] if strategy else all_stats["composite"]
+    tickers = fund_universe(fund, start_date, end_date)
+    returns = GetSeries(ticker=tickers, start=start_date, end=end_date).fetch_returns()
+
+    # Weights recorded at a close earn the next bar's return
+    portfolio = stats.episodes.weights.shift(1).fillna(0.0)
+    benchmark = pd.DataFrame({"SPY": 1.0}, index=returns.index)
+    return BrinsonAttribution(portfolio, benchmark, returns, SecurityMetadata.shared().labels(tickers, grouping).to_dict())
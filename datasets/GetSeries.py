@@ -1,6 +1,7 @@
 import yfinance as yf
 import pandas as pd
 import numpy as np
+from datasets.PricePanel import PricePanel
 
 class GetSeries:
     def __init__(self, ticker="SPY", start="2018-01-01", end="2024-12-31", freq="D", window=None, annualise_vol=True):
@@ -12,10 +13,7 @@ class GetSeries:
         self.annualise_vol = annualise_vol
 
     def fetch_prices(self):
-        df = yf.download(self.ticker, start=self.start, end=self.end)
-        df = df[["Close"]].rename(columns={"Close": "Price"})
-        df.columns = df.columns.get_level_values(1)
-        df.index = pd.to_datetime(df.index)
+        df = PricePanel.shared().get(self.ticker, start=self.start, end=self.end)     # Shared in-memory panel backed by the disk cache
         df = df.resample(self.freq).last().dropna()  # use last closing price in each period
         df.index.name = "Date"
         return df
@@ -51,7 +49,7 @@ if __name__ == "__main__":
     # Get security vols
     vol = GetSeries(tickers, start="2020-01-01", end="2024-12-31").fetch_volatility()
     # Get security metadata
-    ticker = yf.Ticker("AAPL")
-    sector = ticker.info.get("sector", "Unknown")
-    [print(f"{k}: {v}") for k, v in ticker.info.items()]
-    print(f"AAPL Sector: {sector}")
\ No newline at end of file
+    from datasets.SecurityMetadata import SecurityMetadata
+    metadata = SecurityMetadata.shared().get(tickers)
+    print(metadata)
+    print(f"AAPL Sector: {metadata.loc['AAPL', 'sector']}")
\ No newline at end of file
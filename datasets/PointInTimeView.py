@@ -0,0 +1,37 @@
+import pandas as pd
+
+
+class PointInTimeView:
+    """
+    Window over a price frame that only exposes rows up to the current bar.
+    Rows are sliced by integer position, so advancing the view never copies the underlying data.
+    """
+    def __init__(self, data: pd.DataFrame):
+        self._data = data
+        self._stop = len(data)  # Exclusive row position of the current bar
+
+    def advance_to(self, date):
+        """
+        Moves the current bar to the last row dated on or before `date`.
+        """
+        self._stop = self._data.index.searchsorted(pd.Timestamp(date), side="right")
+
+    @property
+    def date(self):
+        return self._data.index[self._stop - 1] if self._stop > 0 else None
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        return self._data.iloc[:self._stop]
+
+    def __len__(self):
+        return self._stop
+
+
+if __name__ == "__main__":
+    from datasets.GetSeries import GetSeries
+    prices = GetSeries(ticker=["AAPL", "MSFT"], start="2020-01-01", end="2024-12-31").fetch_prices()
+    view = PointInTimeView(prices)
+    view.advance_to("2022-06-30")
+    print(view.date, len(view))
+    print(view.frame.tail())
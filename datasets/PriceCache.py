@@ -0,0 +1,130 @@
+import os
+import json
+import datetime
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import yfinance as yf
+
+CACHE_DIR = os.environ.get("QAM_PRICE_CACHE", os.path.join(os.path.dirname(__file__), "cache", "prices"))
+
+
+class PriceCache:
+    """
+    Persistent on-disk store of daily closing prices, one Parquet file per ticker.
+    Each file records the date range already requested from the vendor, so holidays are not re-fetched
+    and only the missing head/tail of a request is downloaded and appended.
+    Closes are dividend and split adjusted as of the day they were downloaded. Each new segment is fetched
+    with a few days' overlap with the stored prices. If the overlap no longer matches, a corporate action
+    has moved the adjustment basis, and the ticker's whole history is fetched again.
+    A download that returns nothing, not even the overlap, is never recorded as covered.
+    """
+    overlap = pd.Timedelta(days=7)
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def get(self, tickers, start, end) -> pd.DataFrame:
+        """
+        Returns a Date x ticker frame of closing prices over [start, end), end exclusive like yf.download.
+        """
+        tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+        start, end = _as_timestamp(start), _as_timestamp(end)
+        stored = {ticker: self._load(ticker) for ticker in tickers}
+
+        # Group tickers by identical gaps so each gap is a single batched download
+        gaps = {}
+        for ticker, (series, coverage) in stored.items():
+            for gap in _missing_ranges(coverage, start, end):
+                gaps.setdefault(gap, []).append(ticker)
+
+        today = pd.Timestamp(datetime.date.today())
+        for (gap_start, gap_end), gap_tickers in gaps.items():
+            fetched = self._download(gap_tickers, gap_start - self.overlap, min(gap_end + self.overlap, today))
+            for ticker in gap_tickers:
+                new = fetched[ticker].dropna() if ticker in fetched else pd.Series(dtype=float, index=pd.DatetimeIndex([]))
+                if new.empty:
+                    # Nothing even in the overlap, an outage, a rate limit or today's bar not yet published.
+                    # Left uncovered so the next call tries again.
+                    continue
+                series, coverage = stored[ticker]
+                coverage = (gap_start, gap_end) if coverage is None else \
+                    (min(coverage[0], gap_start), max(coverage[1], gap_end))
+                common = series.index.intersection(new.index)
+                if len(common) and not np.allclose(series[common], new[common], rtol=1e-6):
+                    # Adjusted on a different basis than the stored prices, replace the whole history
+                    full = self._download([ticker], coverage[0], coverage[1])
+                    if ticker not in full or full[ticker].dropna().empty:
+                        continue  # Keep the stored history and its coverage until the refetch succeeds
+                    series = full[ticker].dropna()
+                else:
+                    new = new[(new.index >= gap_start) & (new.index < gap_end)]
+                    series = pd.concat([series, new]) if not series.empty else new
+                    series = series[~series.index.duplicated(keep="last")].sort_index()
+                stored[ticker] = (series, coverage)
+                self._save(ticker, series, coverage)
+
+        df = pd.DataFrame({ticker: series for ticker, (series, _) in stored.items()}, columns=tickers)
+        df.index = pd.to_datetime(df.index)
+        df.index.name = "Date"
+        return df.loc[(df.index >= start) & (df.index < end)]
+
+    def _path(self, ticker):
+        return os.path.join(self.cache_dir, f"{ticker}.parquet")
+
+    def _load(self, ticker):
+        path = self._path(ticker)
+        if not os.path.exists(path):
+            return pd.Series(dtype=float, index=pd.DatetimeIndex([])), None
+        table = pq.read_table(path)
+        coverage = json.loads(table.schema.metadata[b"coverage"])
+        series = table.to_pandas().set_index("Date")["Price"]
+        return series, (pd.Timestamp(coverage[0]), pd.Timestamp(coverage[1]))
+
+    def _save(self, ticker, series, coverage):
+        df = pd.DataFrame({"Date": series.index, "Price": series.values})
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata[b"coverage"] = json.dumps([coverage[0].isoformat(), coverage[1].isoformat()]).encode()
+        table = table.replace_schema_metadata(metadata)
+        # Write then rename so readers in other processes never see a partial file
+        tmp_path = f"{self._path(ticker)}.{os.getpid()}.tmp"
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, self._path(ticker))
+
+    def _download(self, tickers, start, end) -> pd.DataFrame:
+        df = yf.download(tickers, start=start, end=end, progress=False)
+        if df.empty:
+            return pd.DataFrame()
+        close = df["Close"]
+        if isinstance(close, pd.Series):
+            close = close.to_frame(tickers[0])
+        close.index = pd.to_datetime(close.index)
+        return close
+
+
+def _as_timestamp(date):
+    return pd.Timestamp(date).normalize()
+
+
+def _missing_ranges(coverage, start, end):
+    # Never mark days that haven't happened yet as covered
+    end = min(end, pd.Timestamp(datetime.date.today()))
+    if start >= end:
+        return []
+    if coverage is None:
+        return [(start, end)]
+    covered_start, covered_end = coverage
+    gaps = []
+    if start < covered_start:
+        gaps.append((start, covered_start))
+    if end > covered_end:
+        gaps.append((covered_end, end))
+    return gaps
+
+
+if __name__ == "__main__":
+    cache = PriceCache()
+    prices = cache.get(["AAPL", "MSFT"], start="2020-01-01", end="2024-12-31")
+    print(prices.tail())
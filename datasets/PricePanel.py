@@ -0,0 +1,93 @@
+import datetime
+import threading
+import pandas as pd
+from datasets.PriceCache import PriceCache
+
+
+class PricePanel:
+    """
+    Process-wide in-memory panel of daily closing prices shared by every GetSeries caller.
+    Repeated and concurrent requests for overlapping tickers/dates are served from one master frame,
+    and each ticker is loaded from the PriceCache at most once per covered range.
+    """
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, source=None):
+        self.source = source or PriceCache()
+        self._frame = pd.DataFrame(dtype=float)
+        self._coverage = {}  # {ticker: (start, end)}
+        self._inflight = {}  # {ticker: threading.Event} for loads in progress
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls):
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def get(self, tickers, start, end) -> pd.DataFrame:
+        """
+        Returns a Date x ticker frame of closing prices over [start, end).
+        Rows are sliced by position from the master frame, which is never mutated in place,
+        so callers share its memory rather than receiving their own download.
+        """
+        tickers = list(dict.fromkeys([tickers] if isinstance(tickers, str) else tickers))
+        start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+        end = min(end, pd.Timestamp(datetime.date.today() + datetime.timedelta(days=1)))     # Future dates can't be covered yet
+
+        while True:
+            with self._lock:
+                missing = [t for t in tickers if not self._covers(t, start, end)]
+                if not missing:
+                    frame = self._frame
+                    break
+                waiting = {self._inflight[t] for t in missing if t in self._inflight}
+                claimed = [t for t in missing if t not in self._inflight]
+                done = threading.Event()
+                for ticker in claimed:
+                    self._inflight[ticker] = done
+
+            if claimed:
+                try:
+                    self._load(claimed, start, end)
+                finally:
+                    with self._lock:
+                        for ticker in claimed:
+                            self._inflight.pop(ticker, None)
+                    done.set()
+            # Another thread is already loading these tickers, wait for it and then re-check coverage
+            for event in waiting:
+                event.wait()
+
+        first, last = frame.index.searchsorted([start, end])
+        return frame.iloc[first:last][tickers]
+
+    def _covers(self, ticker, start, end):
+        coverage = self._coverage.get(ticker)
+        return coverage is not None and coverage[0] <= start and coverage[1] >= end
+
+    def _load(self, tickers, start, end):
+        # Load the union of the requested and previously covered ranges so coverage stays contiguous
+        with self._lock:
+            coverages = [self._coverage[t] for t in tickers if t in self._coverage]
+        load_start = min([start] + [c[0] for c in coverages])
+        load_end = max([end] + [c[1] for c in coverages])
+        loaded = self.source.get(tickers, load_start, load_end)
+
+        with self._lock:
+            # Build a new master frame rather than mutating the old one, slices already handed out stay valid
+            frame = self._frame.drop(columns=[t for t in tickers if t in self._frame.columns])
+            frame = frame.join(loaded, how="outer") if not frame.empty else loaded.copy()
+            self._frame = frame.sort_index()
+            for ticker in tickers:
+                self._coverage[ticker] = (load_start, load_end)
+
+
+if __name__ == "__main__":
+    panel = PricePanel.shared()
+    prices = panel.get(["AAPL", "MSFT"], start="2020-01-01", end="2024-12-31")
+    subset = panel.get("AAPL", start="2022-01-01", end="2023-01-01")     # Served from memory
+    print(prices.tail())
+    print(subset.tail())
@@ -0,0 +1,147 @@
+import os
+import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+CACHE_PATH = os.environ.get(
+    "QAM_METADATA_CACHE", os.path.join(os.path.dirname(__file__), "cache", "security_metadata.parquet")
+)
+
+
+class SecurityMetadata:
+    """
+    Local table of sector, country, currency and market cap per ticker, persisted as one Parquet file.
+    Tickers are fetched from Yahoo in bulk (concurrently) only when missing or older than max_age,
+    and groupings map whole ticker arrays to categorical codes so exposures are one grouped sum.
+    A failed lookup is recorded in failed_at and retried after retry_after, not cached for max_age.
+    """
+    fields = ["sector", "country", "currency", "marketCap"]
+    groupings = {"Sector": "sector", "Geography": "country", "Currency": "currency", "Market Cap": "marketCap"}
+    market_cap_buckets = ([0, 2e9, 1e10, np.inf], ["Small Cap", "Mid Cap", "Large Cap"])
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, path=CACHE_PATH, max_age=datetime.timedelta(days=30), retry_after=datetime.timedelta(hours=1), max_workers=16):
+        self.path = path
+        self.max_age = max_age
+        self.retry_after = retry_after
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._table = self._load()
+
+    @classmethod
+    def shared(cls):
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def get(self, tickers) -> pd.DataFrame:
+        """
+        Ticker-indexed frame of fields, refreshing missing or stale tickers first.
+        """
+        tickers = list(dict.fromkeys([tickers] if isinstance(tickers, str) else tickers))
+        with self._lock:
+            table = self._table
+            now = pd.Timestamp.now()
+            known = table.reindex(tickers)
+            expired = known["updated"].isna() | (known["updated"] < now - self.max_age)
+            retry = known["failed_at"].isna() | (known["failed_at"] < now - self.retry_after)
+            stale = known.index[expired & retry].tolist()
+            if stale:
+                table = self._refresh(table, stale)
+        return table.reindex(tickers)[self.fields]
+
+    def labels(self, tickers, grouping="Sector") -> pd.Series:
+        """
+        Ticker -> label for a grouping ("Sector", "Geography", "Currency" or "Market Cap"), "Unknown" if missing.
+        """
+        values = self.get(tickers)[self.groupings[grouping]]
+        if grouping == "Market Cap":
+            edges, names = self.market_cap_buckets
+            values = pd.cut(values.astype(float), edges, labels=names).astype(object)
+        return values.fillna("Unknown")
+
+    def codes(self, tickers, grouping="Sector"):
+        """
+        (codes, categories) with codes[i] the position of tickers[i]'s label in categories.
+        """
+        codes, categories = pd.factorize(self.labels(tickers, grouping), sort=True)
+        return codes, list(categories)
+
+    def exposures(self, weights, grouping="Sector"):
+        """
+        Weights summed by group. A Series of ticker weights gives a Series, a Date x ticker frame gives Date x group.
+        """
+        codes, categories = self.codes(list(weights.index if isinstance(weights, pd.Series) else weights.columns), grouping)
+        if isinstance(weights, pd.Series):
+            return pd.Series(np.bincount(codes, weights=weights.fillna(0.0).to_numpy(), minlength=len(categories)), index=categories)
+        one_hot = np.zeros((len(codes), len(categories)))
+        one_hot[np.arange(len(codes)), codes] = 1.0
+        return pd.DataFrame(weights.fillna(0.0).to_numpy() @ one_hot, index=weights.index, columns=categories)
+
+    def _refresh(self, table, tickers):
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            rows = dict(zip(tickers, pool.map(_fetch_info, tickers)))
+        now = pd.Timestamp.now()
+        # A failed lookup keeps the ticker's earlier fields and update time if it has them, and is only
+        # tried again once retry_after has passed since failed_at
+        failed = [t for t, row in rows.items() if row is None]
+        previous = table.reindex(failed)
+        fetched = pd.DataFrame(
+            [row if row is not None else previous.loc[t, self.fields].to_dict() for t, row in rows.items()],
+            index=list(rows), columns=self.fields
+        )
+        fetched["updated"] = pd.Series(now, index=fetched.index).where(~fetched.index.isin(failed), previous["updated"])
+        fetched["failed_at"] = pd.Series(now, index=fetched.index).where(fetched.index.isin(failed))
+        table = pd.concat([table.drop(index=fetched.index, errors="ignore"), fetched]).sort_index()
+        table.index.name = "Ticker"
+        self._save(table)
+        self._table = table  # Replaced rather than mutated so readers holding the old frame are unaffected
+        return table
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return pd.DataFrame(columns=self.fields + ["updated", "failed_at"], index=pd.Index([], name="Ticker")).astype(
+                {"marketCap": float, "updated": "datetime64[ns]", "failed_at": "datetime64[ns]"}
+            )
+        table = pd.read_parquet(self.path)
+        if "failed_at" not in table:  # Written before failures were recorded
+            table["failed_at"] = pd.Series(pd.NaT, index=table.index, dtype="datetime64[ns]")
+        return table
+
+    def _save(self, table):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # Write then rename so readers in other processes never see a partial file
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        table.to_parquet(tmp_path)
+        os.replace(tmp_path, self.path)
+
+
+def _fetch_info(ticker) -> dict | None:
+    # None when Yahoo has nothing for the ticker, e.g. a network error or rate limit
+    try:
+        info = yf.Ticker(ticker).info
+    except Exception:
+        return None
+    if not any(info.get(field) for field in SecurityMetadata.fields):
+        return None
+    return {
+        "sector": info.get("sector"),
+        "country": info.get("country"),
+        "currency": info.get("currency"),
+        "marketCap": float(info["marketCap"]) if info.get("marketCap") else np.nan,
+    }
+
+
+if __name__ == '__main__':
+    tickers = ["AAPL", "MSFT", "GOOGL", "AMZN", "TSLA", "BHP.AX"]
+    metadata = SecurityMetadata.shared()
+    print(metadata.get(tickers))
+    weights = pd.Series(1 / len(tickers), index=tickers)
+    for grouping in SecurityMetadata.groupings:
+        print(metadata.exposures(weights, grouping))
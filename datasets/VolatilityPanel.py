@@ -0,0 +1,107 @@
+import threading
+import numpy as np
+import pandas as pd
+from datasets.GetSeries import GetSeries
+from utils.cache_keys import config_key, as_date
+
+
+class VolatilityPanel:
+    """
+    Date x ticker annualised volatility, each row estimated from returns up to and including that date.
+    method: "rolling" (trailing window std), "ewma" (zero-mean exponentially weighted) or
+    "garch" (GARCH(1,1) one-step-ahead forecast, fitted for every ticker at once by grid search).
+    Built once per universe and estimator and shared by every strategy through shared().
+    """
+    methods = ("rolling", "ewma", "garch")
+    end_date_fields = ("end",)  # Rows only depend on returns up to their date, so a longer panel extends a shorter one
+
+    _shared = {}  # {panel key: VolatilityPanel}
+    _lock = threading.Lock()
+
+    def __init__(self, tickers, start, end, method="ewma", window=63, halflife=21, min_periods=20):
+        if method not in self.methods:
+            raise ValueError(f"Unknown volatility method {method}, expected one of {self.methods}")
+        self.tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+        self.start, self.end = start, end
+        self.method = method
+        self.window = window  # Bars, rolling
+        self.halflife = halflife  # Bars, ewma
+        self.min_periods = min_periods  # Bars before the first estimate
+
+        returns = GetSeries(ticker=self.tickers, start=start, end=end).fetch_returns()
+        variance = {"rolling": self._rolling, "ewma": self._ewma, "garch": self._garch}[method](returns)
+        self.panel = np.sqrt(variance * 252)
+
+    @classmethod
+    def shared(cls, tickers, start, end, method="ewma", **kwargs):
+        tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+        key = config_key("volatility", sorted(tickers), as_date(start), as_date(end), method, kwargs)
+        with cls._lock:
+            if key not in cls._shared:
+                cls._shared[key] = cls(tickers, start, end, method=method, **kwargs)
+            return cls._shared[key]
+
+    def fingerprint(self) -> dict:
+        return {
+            "tickers": self.tickers,
+            "start": as_date(self.start),
+            "end": as_date(self.end),
+            "method": self.method,
+            "window": self.window,
+            "halflife": self.halflife,
+            "min_periods": self.min_periods,
+        }
+
+    def at(self, date) -> pd.Series:
+        """
+        Volatility per ticker as of date (the last row on or before it), NaN before the first estimate.
+        """
+        row = self.panel.index.searchsorted(pd.Timestamp(date), side="right") - 1
+        if row < 0:
+            return pd.Series(np.nan, index=self.panel.columns)
+        return self.panel.iloc[row]
+
+    def _rolling(self, returns):
+        return returns.rolling(self.window, min_periods=self.min_periods).var()
+
+    def _ewma(self, returns):
+        return (returns ** 2).ewm(halflife=self.halflife, min_periods=self.min_periods).mean()
+
+    def _garch(self, returns, grid_size=15):
+        """
+        Variance-targeted GARCH(1,1), h_{t+1} = w_t + a r_t^2 + b h_t with w_t = var_t (1 - a - b) from the
+        expanding sample variance. Every (a, b) on the grid is filtered for every ticker in one pass over time,
+        and each row uses the grid point with the best Gaussian log-likelihood so far, so nothing is fitted
+        on data after the row's date.
+        """
+        alphas, betas = np.meshgrid(np.linspace(0.01, 0.3, grid_size), np.linspace(0.5, 0.99, grid_size))
+        stationary = alphas + betas < 0.999
+        alphas, betas = alphas[stationary][:, None], betas[stationary][:, None]  # (G, 1) against (N,) tickers
+
+        r = returns.to_numpy()
+        r2 = r ** 2
+        n_dates, n_tickers = r.shape
+        target = np.cumsum(r2, axis=0) / np.arange(1, n_dates + 1)[:, None]  # Expanding variance, zero mean
+
+        h = np.broadcast_to(r2[0], (len(alphas), n_tickers)).copy()  # Forecast for the next bar
+        log_lik = np.zeros_like(h)
+        forecast = np.full((n_dates, n_tickers), np.nan)
+        columns = np.arange(n_tickers)
+        for t in range(n_dates):
+            if t > 0:
+                # h was forecast at t - 1 for bar t, score it against the realised return
+                safe_h = np.maximum(h, 1e-12)
+                log_lik -= 0.5 * (np.log(safe_h) + r2[t] / safe_h)
+            h = target[t] * (1 - alphas - betas) + alphas * r2[t] + betas * h
+            if t + 1 >= self.min_periods:
+                forecast[t] = h[np.argmax(log_lik, axis=0), columns]
+        return pd.DataFrame(forecast, index=returns.index, columns=returns.columns)
+
+
+if __name__ == '__main__':
+    tickers = ["AAPL", "MSFT", "GOOG", "TSLA"]
+    for method in VolatilityPanel.methods:
+        vols = VolatilityPanel.shared(tickers, "2020-01-01", "2024-12-31", method=method)
+        print(method)
+        print(vols.panel.dropna().tail(3))
+        print(vols.at("2023-06-30"))
@@ -65,6 +65,11 @@ metrics = [
 ]
 render_metric_grid(metrics, columns=3)
 
+with st.expander("Confidence Intervals (95%)"):
+    ci_method = st.radio("Resampling", ["Block Bootstrap", "Monte Carlo"], horizontal=True, key="ci_method")
+    intervals = stats.confidence_intervals(method="block" if ci_method == "Block Bootstrap" else "monte_carlo", seed=0)
+    st.dataframe(intervals.round(2), use_container_width=True)
+
 st.markdown("---")
 
 # --- Cumulative Returns ---
@@ -107,14 +112,8 @@ col1, col2 = st.columns(2)
 with col1:
     # metric = st.selectbox("Metric", ["Total Return", "Excess Return", "Volatility", "Sharpe Ratio", "Tracking Error",
     #                                  "Information Ratio", "Beta", "Drawdown", "Up Capture", "Down Capture", "Turnover"])
-    metric = st.selectbox("Metric", ["Volatility", "Sharpe Ratio", "Information Ratio"])
+    metric = st.selectbox("Metric", ["Volatility", "Sharpe Ratio", "Tracking Error", "Information Ratio", "Beta"])
 with col2:
     window = st.selectbox("Rolling Window (Months)", [3, 6, 12])
-metric_map = {
-    "Volatility": stats.rolling_metrics[f"{window}M"]["Volatility"],
-    "Sharpe Ratio": stats.rolling_metrics[f"{window}M"]["Sharpe Ratio"],
-    # "Tracking Error": stats.rolling_metrics[f"{window}M"]["Tracking Error"],
-    "Information Ratio": stats.rolling_metrics[f"{window}M"]["Information Ratio"],
-}
-rolling = metric_map.get(metric)
+rolling = stats.rolling_metrics[f"{window}M"][metric]
 render_dual_line_chart(f"Rolling {metric} ({window}-Month)", rolling)
@@ -5,24 +5,29 @@ from utils.helper_functions import (
     render_global_toolbar,
     render_dual_line_chart,
     render_styled_bar_chart,
+    build_fund_registry,
 )
+from app_state import get_performance_stats, get_brinson_attribution, get_risk_decomposition
+from datasets.SecurityMetadata import SecurityMetadata
 
 st.set_page_config(layout="wide")
 st.markdown("<h2 style='text-align: center;'>Portfolio Positioning</h2>", unsafe_allow_html=True)
 
 # --- Toolbar ---
-fund_list = ["Querido Global Macro Fund", "Querido Global Macro Fund II", "Querido Global Macro Fund III"]
-strategy_list = ["Global Macro", "Quantitative Equity", "Systematic Macro", "Statistical Arbitrage"]
-render_global_toolbar(fund_list, strategy_list)
+start_date = st.session_state.get("start_date", "2020-01-01")
+end_date = st.session_state.get("end_date", "2024-12-31")
+fund_registry = build_fund_registry(start_date, end_date)
+render_global_toolbar(fund_registry)
 
 # --- Inputs ---
-fund = st.session_state.get("fund", "Fund A")
-strategy = st.session_state.get("strategy", "Strategy X")
-start_date = st.session_state.get("start_date")
-end_date = st.session_state.get("end_date")
+fund = st.session_state.get("fund", "Querido Capital Fund 1")
+strategy = st.session_state.get("strategy")
 pit_date = st.session_state.get("pit_date")
 
 level = st.radio("View Level", ["Composite", "Strategy"], horizontal=True)
+selected_strategy = strategy if level == "Strategy" else None
+all_stats = get_performance_stats(fund, start_date, end_date)
+stats = all_stats["strategies"][selected_strategy] if selected_strategy else all_stats["composite"]
 
 # --- Section 1: PIT Strategy Metrics (Composite Only) ---
 if level == "Composite":
@@ -59,16 +64,19 @@ st.markdown("---")
 # --- Section 4: Sector & Geography Exposure ---
 st.markdown("#### Sector and Geographic Exposure")
 exposure_type = st.radio("Exposure Type", ["Sector", "Market Cap", "Geography", "Currency"], horizontal=True)
-categories = [f"{exposure_type} {i+1}" for i in range(5)]
-portfolio_exp = np.random.rand(5)
-benchmark_exp = np.random.rand(5)
-active_exp = portfolio_exp - benchmark_exp
+metadata = SecurityMetadata.shared()
+weights = stats.episodes.weights
+as_of = weights.index[weights.index <= pd.Timestamp(pit_date)][-1] if pit_date else weights.index[-1]
+portfolio_exp = metadata.exposures(weights.loc[as_of], exposure_type)
+benchmark_exp = metadata.exposures(pd.Series({"SPY": 1.0}), exposure_type)
 
 df_exp = pd.DataFrame({
     "Portfolio": portfolio_exp,
     "Benchmark": benchmark_exp,
-    "Active": active_exp
-}, index=categories)
+}).fillna(0.0)
+df_exp["Active"] = df_exp["Portfolio"] - df_exp["Benchmark"]
+categories = df_exp.index.tolist()
+active_exp = df_exp["Active"].values
 
 st.dataframe(df_exp.style.background_gradient(cmap="Oranges"), use_container_width=True)
 
@@ -82,17 +90,10 @@ with col1:
     brinson_type = st.selectbox("Attribution Type", ["Sector", "Geography", "Market Cap", "Currency"])
 with col2:
     period = st.selectbox("Period", ["1 Month", "1 Quarter", "12 Months"])
-allocation = np.random.normal(0, 0.5, 5)
-selection = np.random.normal(0, 0.5, 5)
-interaction = np.random.normal(0, 0.2, 5)
-total = allocation + selection + interaction
-
-df_brinson = pd.DataFrame({
-    "Allocation": allocation,
-    "Selection": selection,
-    "Interaction": interaction,
-    "Total": total
-}, index=[f"{brinson_type} {i+1}" for i in range(5)])
+attribution = get_brinson_attribution(fund, start_date, end_date, strategy=selected_strategy, grouping=brinson_type)
+period_end = attribution.dates[attribution.dates <= pd.Timestamp(pit_date)][-1] if pit_date else attribution.dates[-1]
+period_start = period_end - pd.DateOffset(months={"1 Month": 1, "1 Quarter": 3, "12 Months": 12}[period])
+df_brinson = attribution.summary(period_start + pd.Timedelta(days=1), period_end)
 
 st.dataframe(df_brinson.style.background_gradient(cmap="Greens"), use_container_width=True)
 render_styled_bar_chart("Total Attribution Effect", df_brinson.index.tolist(), df_brinson["Total"].values,
@@ -102,6 +103,6 @@ st.markdown("---")
 
 # --- Section 6: Risk Decomposition ---
 st.markdown("#### Factor/Idiosyncratic Risk Decomposition")
-risk_types = ["Style", "Industry", "Market", "Currency", "Idiosyncratic"]
-contributions = np.random.rand(len(risk_types))
-render_styled_bar_chart("Risk Contribution", risk_types, contributions, x_title="Risk Type", y_title="Contribution")
+risk = get_risk_decomposition(fund, start_date, end_date, strategy=selected_strategy)
+risk_at = risk.loc[risk.index[risk.index <= pd.Timestamp(pit_date)][-1] if pit_date else risk.index[-1]]
+render_styled_bar_chart("Risk Contribution", list(risk.columns), risk_at.values, x_title="Risk Type", y_title="Contribution")
@@ -1,37 +1,53 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from utils.helper_functions import render_global_toolbar, render_dual_line_chart
+from utils.helper_functions import render_global_toolbar, render_dual_line_chart, build_fund_registry
+from app_state import get_performance_stats
 
 st.set_page_config(layout="wide")
-st.markdown("<h2 style='text-align: center;'>Trade Analysis</h2>", unsafe_allow_html=True)
+st.markdown("<h2 style='text-align: center;'>Holdings</h2>", unsafe_allow_html=True)
 
 # --- Toolbar ---
-fund_list = ["Querido Global Macro Fund", "Querido Global Macro Fund II", "Querido Global Macro Fund III"]
-strategy_list = ["Global Macro", "Quantitative Equity", "Systematic Macro", "Statistical Arbitrage"]
-render_global_toolbar(fund_list, strategy_list)
+start_date = st.session_state.get("start_date", "2020-01-01")
+end_date = st.session_state.get("end_date", "2024-12-31")
+fund_registry = build_fund_registry(start_date, end_date)
+render_global_toolbar(fund_registry)
 
 # --- Inputs ---
-fund = st.session_state.get("fund")
+fund = st.session_state.get("fund", "Querido Capital Fund 1")
 strategy = st.session_state.get("strategy")
 pit_date = st.session_state.get("pit_date")
-start_date = st.session_state.get("start_date")
-end_date = st.session_state.get("end_date")
+
+level = st.radio("View Level", ["Composite", "Strategy"], horizontal=True)
+all_stats = get_performance_stats(fund, start_date, end_date)
+stats = all_stats["strategies"][strategy] if level == "Strategy" else all_stats["composite"]
+episodes = stats.episodes
 
 # --- Duration Buckets ---
 buckets = ["<1 Month", "1–3 Months", "3–6 Months", "6–12 Months", ">1 Year"]
-num_stocks = np.random.randint(10, 50, len(buckets))
-weights = np.random.uniform(1, 10, len(buckets)).round(2)
-returns = np.random.normal(0.5, 0.2, len(buckets)).round(2)
-
-df = pd.DataFrame({
-    "Holding Period": buckets,
-    "Number of Stocks": num_stocks,
-    "Total Weight (%)": weights,
-    "Relative Return (%)": returns
-}).set_index("Holding Period")
-
-st.markdown("### Holdings by Duration")
+bucket_edges = [-np.inf, 30, 91, 182, 365, np.inf]  # Calendar days held
+
+age = episodes.holding_age()
+as_of = age.index[age.index <= pd.Timestamp(pit_date)][-1] if pit_date else age.index[-1]
+current = pd.DataFrame({
+    "Age": age.loc[as_of],
+    "Weight": episodes.weights.loc[as_of],
+}).dropna()
+current["Holding Period"] = pd.cut(current["Age"], bucket_edges, labels=buckets)
+
+# Return on each current holding's episode from entry up to as_of
+open_episodes = episodes.open_at(as_of)
+current["Return"] = open_episodes["PnL"] / open_episodes["Entry Value"]
+
+df = current.groupby("Holding Period", observed=False).agg(
+    **{
+        "Number of Stocks": ("Weight", "size"),
+        "Total Weight (%)": ("Weight", lambda w: w.sum() * 100),
+        "Return (%)": ("Return", lambda r: r.mean() * 100),
+    }
+).round(2)
+
+st.markdown(f"### Holdings by Duration ({as_of.date()})")
 st.dataframe(df)
 
 # --- Chart Selection ---
@@ -40,12 +56,16 @@ st.markdown("### Time Series by Holding Duration")
 
 col1, col2 = st.columns(2)
 with col1:
-    metric = st.selectbox("Metric", ["Number of Stocks", "Total Weight (%)", "Relative Return (%)"])
+    metric = st.selectbox("Metric", ["Number of Stocks", "Total Weight (%)"])
 with col2:
     duration = st.selectbox("Holding Period", buckets)
 
-# --- Dummy Time Series ---
-dates = pd.date_range(start=start_date, end=end_date, periods=50)
-series = pd.Series(np.random.normal(5, 1, len(dates)), index=dates)
+# Every date at once, a holding is in the bucket while its age falls in the bucket's range
+low, high = bucket_edges[buckets.index(duration)], bucket_edges[buckets.index(duration) + 1]
+in_bucket = (age > low) & (age <= high)
+if metric == "Number of Stocks":
+    series = in_bucket.sum(axis=1)
+else:
+    series = episodes.weights.where(in_bucket, 0.0).sum(axis=1) * 100
 
 render_dual_line_chart(f"{metric} for {duration}", series)
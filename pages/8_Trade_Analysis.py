@@ -1,43 +1,36 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from utils.helper_functions import render_dual_line_chart, render_global_toolbar
+from utils.helper_functions import render_dual_line_chart, render_global_toolbar, build_fund_registry
+from app_state import get_performance_stats
 
 # --- Sidebar ---
-fund_list = [
-    "Querido Global Macro Fund",
-    "Querido Global Macro Fund II",
-    "Querido Global Macro Fund III",
-]
-strategy_list = [
-    "Global Macro",
-    "Quantitative Equity",
-    "Systematic Macro",
-    "Statistical Arbitrage",
-]
-render_global_toolbar(fund_list, strategy_list)
+start_date = st.session_state.get("start_date", "2020-01-01")
+end_date = st.session_state.get("end_date", "2024-12-31")
+fund_registry = build_fund_registry(start_date, end_date)
+render_global_toolbar(fund_registry)
 
 st.markdown("<h2 style='text-align: center;'>Rolling Statistics</h2>", unsafe_allow_html=True)
 
 # --- Global Inputs ---
-fund = st.session_state.get("fund", "Fund A")
-strategy = st.session_state.get("strategy", "Strategy X")
-start_date = st.session_state.get("start_date")
-end_date = st.session_state.get("end_date")
+fund = st.session_state.get("fund", "Querido Capital Fund 1")
+strategy = st.session_state.get("strategy")
 
 # --- Dropdowns for Metric and Level ---
-metric = st.selectbox("Select Rolling Metric", [
-    "Volatility", "Beta", "Sharpe Ratio", "Tracking Error", "Information Ratio"
-])
+col1, col2 = st.columns(2)
+with col1:
+    metric = st.selectbox("Select Rolling Metric", [
+        "Volatility", "Beta", "Sharpe Ratio", "Tracking Error", "Information Ratio"
+    ])
+with col2:
+    window = st.selectbox("Rolling Window (Months)", [3, 6, 12])
 level = st.radio("View For", ["Composite", "Strategy"])
 
-# --- Simulated Rolling Time Series ---
-dates = pd.date_range(start=start_date, end=end_date, periods=60)
-composite_series = pd.Series(np.random.normal(0.8, 0.1, len(dates)), index=dates)
-strategy_series = pd.Series(np.random.normal(0.75, 0.15, len(dates)), index=dates)
-
-# --- Render Line Chart ---
+# --- Rolling Time Series ---
+all_stats = get_performance_stats(fund, start_date, end_date)
 if level == "Composite":
-    render_dual_line_chart(f"Composite {metric} (Rolling)", composite_series)
+    series = all_stats["composite"].rolling_metrics[f"{window}M"][metric]
+    render_dual_line_chart(f"Composite {metric} (Rolling)", series.dropna())
 else:
-    render_dual_line_chart(f"{strategy} {metric} (Rolling)", strategy_series)
+    series = all_stats["strategies"][strategy].rolling_metrics[f"{window}M"][metric]
+    render_dual_line_chart(f"{strategy} {metric} (Rolling)", series.dropna())
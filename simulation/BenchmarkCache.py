@@ -0,0 +1,55 @@
+import os
+import threading
+import pandas as pd
+
+CACHE_DIR = os.environ.get("QAM_BENCHMARK_CACHE", os.path.join(os.path.dirname(__file__), "cache", "benchmarks"))
+
+
+class BenchmarkCache:
+    """
+    Benchmark return series keyed by benchmark config, tickers, dates, costs, the day the data runs to and the
+    code version (see StrategyExecution.benchmark_key).
+    Results are memoised for the whole process and persisted as Parquet so restarts and pool workers reuse them.
+    """
+    _memory = {}  # {key: pd.Series}, shared by every instance in the process
+    _lock = threading.Lock()
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def get(self, key):
+        with self._lock:
+            if key in self._memory:
+                return self._memory[key]
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        returns = pd.read_parquet(path)["returns"]
+        self.put(key, returns, persist=False)
+        return returns
+
+    def contains(self, key):
+        with self._lock:
+            if key in self._memory:
+                return True
+        return os.path.exists(self._path(key))
+
+    def put(self, key, returns: pd.Series, persist=True):
+        with self._lock:
+            self._memory[key] = returns
+        if persist:
+            # Write then rename so a concurrent reader never sees a partial file
+            tmp_path = f"{self._path(key)}.{os.getpid()}.tmp"
+            returns.rename("returns").to_frame().to_parquet(tmp_path)
+            os.replace(tmp_path, self._path(key))
+
+    def get_or_run(self, key, run_fn):
+        returns = self.get(key)
+        if returns is None:
+            returns = run_fn()
+            self.put(key, returns)
+        return returns
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.parquet")
@@ -0,0 +1,170 @@
+import os
+import time
+import datetime
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from simulation.StrategyExecution import run_engine, run_benchmark, results_key, benchmark_key, fund_key
+from simulation.ResultsStore import ResultsStore
+from simulation.BenchmarkCache import BenchmarkCache
+from strategies.InitialiseStrategy import InitialiseStrategy
+from strategies.StrategyEnsemble import StrategyEnsemble
+from strategies.signal_generation.BuyAndHoldStrategy import BuyAndHoldStrategy
+from strategies.signal_generation.MeanReversionStrategy import MeanReversionStrategy
+from strategies.allocations.EqualWeightAllocator import EqualWeightAllocator
+from utils.helper_functions import build_fund_registry, DEFAULT_START_DATE, default_end_date
+
+COSTS = {"slippage": 0.001, "commission": 0.0005}
+BENCHMARK_TICKER = "SPY"
+# The pages' session defaults, warmed first
+DEFAULT_FUND = "Querido Capital Fund 1"
+PAGE_FALLBACK_END_DATE = "2024-12-31"  # A page's end date before the toolbar has set one
+
+
+def default_ranges():
+    """
+    The date ranges the pages open on: the toolbar's defaults, evaluated now since the end date is today,
+    and the pages' fallback range for a session that hasn't rendered the toolbar yet.
+    """
+    return [(DEFAULT_START_DATE, default_end_date()), (DEFAULT_START_DATE, PAGE_FALLBACK_END_DATE)]
+
+
+def fund_backtests(fund_components, start_date, end_date):
+    """
+    Every backtest the Performance page needs for one fund:
+    {"strategies": {name: (tickers, strat, benchmark_strat)}, "composite": (tickers, ensemble, benchmark_strat)}
+    """
+    strategy_benchmark = InitialiseStrategy(
+        strategy_cls=MeanReversionStrategy,
+        allocator_cls=EqualWeightAllocator,
+        tickers=[BENCHMARK_TICKER],
+        start=start_date,
+        end=end_date,
+        strategy_kwargs={"lookback": 20, "bound": 1.5},
+        allocator_kwargs={}
+    )
+    composite_benchmark = InitialiseStrategy(
+        strategy_cls=BuyAndHoldStrategy,
+        allocator_cls=EqualWeightAllocator,
+        tickers=BENCHMARK_TICKER,
+        start=start_date,
+        end=end_date
+    )
+
+    strategies = {
+        name: (strat.tickers if hasattr(strat, "tickers") else [], strat, strategy_benchmark)
+        for name, (strat, weight) in fund_components.capital_allocation.items()
+    }
+    all_tickers = sorted(set(t for strat, _ in fund_components.capital_allocation.values() for t in strat.tickers))
+    ensemble = StrategyEnsemble(dict(fund_components.capital_allocation))
+    return {"strategies": strategies, "composite": (all_tickers, ensemble, composite_benchmark)}
+
+
+class CacheWarmup:
+    """
+    Precomputes every fund and strategy backtest in the registry over the default date ranges so page
+    scripts only read the ResultsStore and BenchmarkCache. The default fund is scheduled first, runs
+    already stored are skipped and at most max_workers backtests run at once. Each fund's manifest is
+    written once all its runs are stored. Stored keys carry the code version and the day their data runs
+    to, so a key that exists is fresh. run_daily() repeats the pass after every midnight, when the default
+    range ends on a new day.
+    """
+    def __init__(self, ranges=None, funds=None, max_workers=2, costs=None):
+        self._ranges = ranges
+        self.funds = funds
+        self.max_workers = max_workers
+        self.costs = costs or COSTS
+
+    @property
+    def ranges(self):
+        # Recomputed on every pass, the toolbar's default end date is today
+        return self._ranges or default_ranges()
+
+    def jobs(self):
+        """
+        [(label, key, fn, args)] in priority order, one per distinct backtest.
+        """
+        jobs = {}
+        self.manifests = {}  # {fund key: manifest} for ResultsStore.put_manifest once the fund's runs are stored
+        for start_date, end_date in self.ranges:
+            registry = build_fund_registry(start_date, end_date)
+            funds = self.funds or list(registry)
+            for fund in sorted(funds, key=lambda f: f != DEFAULT_FUND):  # Stable, so the registry order is kept otherwise
+                backtests = fund_backtests(registry[fund], start_date, end_date)
+                manifest = {"strategies": {}}
+                runs = dict(backtests["strategies"])
+                runs[None] = backtests["composite"]
+                for name, (tickers, strat, benchmark_strat) in runs.items():
+                    label = f"{fund} / {name or 'Composite'}"
+                    key = results_key(tickers, strat, start_date, end_date, **self.costs)
+                    jobs.setdefault(key, (label, key, run_engine, (tickers, strat, start_date, end_date)))
+                    bmk_key = benchmark_key(BENCHMARK_TICKER, benchmark_strat, start_date, end_date, **self.costs)
+                    jobs.setdefault(bmk_key, (f"{label} benchmark", bmk_key, run_benchmark, (BENCHMARK_TICKER, benchmark_strat, start_date, end_date)))
+                    if name is None:
+                        manifest["composite"] = [key, bmk_key]
+                    else:
+                        manifest["strategies"][name] = [key, bmk_key]
+                self.manifests[fund_key(registry.fingerprint(fund), start_date, end_date, **self.costs)] = manifest
+        return list(jobs.values())
+
+    def pending(self):
+        store, benchmarks = ResultsStore(), BenchmarkCache()
+        return [
+            job for job in self.jobs()
+            if not (benchmarks.contains(job[1]) if job[2] is run_benchmark else store.contains(job[1]))
+        ]
+
+    def run(self):
+        """
+        Runs every pending backtest, returns {label: error} for the ones that failed.
+        """
+        pending = self.pending()
+        print(f"Cache warm-up: {len(pending)} backtests to run")
+        errors = {}
+        if pending:
+            started = time.time()
+            with ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+                # The pool starts tasks in submission order, so the default fund is computed first
+                futures = {pool.submit(fn, *args, **self.costs): label for label, key, fn, args in pending}
+                for future in as_completed(futures):
+                    if future.exception() is not None:
+                        errors[futures[future]] = future.exception()
+                        print(f"Cache warm-up: {futures[future]} failed: {future.exception()}")
+                    else:
+                        print(f"Cache warm-up: {futures[future]} done ({time.time() - started:.1f}s)")
+        self.write_manifests()
+        return errors
+
+    def run_daily(self):
+        """
+        run() now and again shortly after each midnight, for as long as the process lives.
+        """
+        while True:
+            try:
+                self.run()
+            except Exception as error:  # E.g. a data outage while building the funds, tried again tomorrow
+                print(f"Cache warm-up failed: {error}")
+            tomorrow = datetime.datetime.combine(datetime.date.today() + datetime.timedelta(days=1), datetime.time(0, 5))
+            time.sleep(max(0.0, (tomorrow - datetime.datetime.now()).total_seconds()))
+
+    def write_manifests(self):
+        # Only funds whose every run is stored, get_performance_stats then serves them from the config alone
+        store, benchmarks = ResultsStore(), BenchmarkCache()
+        for key, manifest in self.manifests.items():
+            runs = [manifest["composite"], *manifest["strategies"].values()]
+            if all(store.contains(run_key) and benchmarks.contains(bmk_key) for run_key, bmk_key in runs):
+                store.put_manifest(key, manifest)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Precompute every registry backtest into the results cache.")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--fund", action="append", help="Only warm these funds (repeatable)")
+    parser.add_argument("--start", help="Start date, with --end replaces the default range")
+    parser.add_argument("--end")
+    parser.add_argument("--daily", action="store_true", help="Keep running, warming again after each midnight")
+    args = parser.parse_args()
+
+    ranges = [(args.start, args.end)] if args.start and args.end else None
+    warmup = CacheWarmup(ranges=ranges, funds=args.fund, max_workers=args.workers)
+    warmup.run_daily() if args.daily else warmup.run()
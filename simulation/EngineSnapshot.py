@@ -0,0 +1,135 @@
+import os
+import glob
+import json
+import shutil
+import importlib
+import numpy as np
+import pandas as pd
+
+SNAPSHOT_VERSION = 3
+
+
+class EngineSnapshot:
+    """
+    Versioned state of a BacktestEngine after one bar: the holdings and cash it carries into the next bar,
+    the closes they were valued at and the settings a continuation needs (start date, costs, cash buffer,
+    rebalancer). A few length-N arrays, saved as a single .npz readable without pickle. The history up to
+    the snapshot isn't copied: a resume reads it from the results of the run the snapshot was taken from
+    (the stored run, or the run's checkpoints, see write_checkpoint).
+    """
+    def __init__(self, date, tickers, holdings, cash, prices, settings: dict):
+        self.date = pd.Timestamp(date)
+        self.tickers = list(tickers)
+        self.holdings = pd.Series(np.asarray(holdings, dtype=float), index=self.tickers)  # Quantities after the bar
+        self.cash = float(cash)
+        self.prices = np.asarray(prices, dtype=float)  # (N,) closes at the bar
+        self.settings = dict(settings)
+
+    def priced_like(self, prices: pd.DataFrame) -> bool:
+        """
+        Whether a Date x ticker price frame has the closes this snapshot was taken at. A dividend or split
+        after the snapshot rescales the whole adjusted history (see PriceCache), so its holdings were sized
+        on prices that no longer exist and the run has to start over.
+        """
+        if self.date not in prices.index:
+            return False
+        shared = [i for i, ticker in enumerate(self.tickers) if ticker in prices.columns]  # A fork may trade fewer
+        current = prices.loc[self.date, [self.tickers[i] for i in shared]].to_numpy(dtype=float)
+        return bool(np.allclose(current, self.prices[shared], rtol=1e-6, equal_nan=True))
+
+    def engine_kwargs(self) -> dict:
+        """
+        BacktestEngine keyword arguments that reproduce the snapshotted run's settings.
+        """
+        module, _, name = self.settings["rebalancer"].rpartition(".")
+        return {
+            "rebalancer": getattr(importlib.import_module(module), name),
+            "cash_buffer": self.settings["cash_buffer"],
+            "initial_cash": self.settings["initial_cash"],
+            "slippage": self.settings["slippage"],
+            "commission": self.settings["commission"],
+        }
+
+    def save(self, path):
+        arrays = {
+            "meta": np.array(json.dumps({"version": SNAPSHOT_VERSION, "settings": self.settings})),
+            "date": np.array(self.date.to_datetime64(), dtype="datetime64[ns]"),
+            "tickers": np.array(self.tickers, dtype=str),
+            "holdings": self.holdings.to_numpy(),
+            "cash": np.array(self.cash),
+            "prices": self.prices,
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # Write then rename so a reader never loads a partial snapshot
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez_compressed(f, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as arrays:
+            meta = json.loads(str(arrays["meta"]))
+            if meta["version"] != SNAPSHOT_VERSION:
+                raise ValueError(f"Snapshot {path} is version {meta['version']}, this engine reads version {SNAPSHOT_VERSION}")
+            return cls(
+                arrays["date"][()], arrays["tickers"].tolist(), arrays["holdings"], float(arrays["cash"]), arrays["prices"],
+                meta["settings"]
+            )
+
+
+def write_checkpoint(checkpoint_dir, snapshot, segment):
+    """
+    Saves a snapshot with segment, (equity_curve, trades_df, positions_df) for the bars since the previous
+    checkpoint, so each checkpoint writes only its own bars and read_checkpoint stitches the history back.
+    """
+    path = os.path.join(checkpoint_dir, f"{snapshot.date:%Y-%m-%d}")
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    os.makedirs(tmp_path, exist_ok=True)
+    equity_curve, trades, positions = segment
+    for name, frame in zip(["equity_curve", "trades", "positions"], [equity_curve.to_frame("Market Value"), trades, positions]):
+        frame.to_parquet(os.path.join(tmp_path, f"{name}.parquet"), compression="zstd")
+    snapshot.save(os.path.join(tmp_path, "snapshot.npz"))
+    shutil.rmtree(path, ignore_errors=True)
+    os.rename(tmp_path, path)
+
+
+def checkpoint_dates(checkpoint_dir) -> list:
+    return sorted(pd.Timestamp(os.path.basename(path)) for path in glob.glob(os.path.join(checkpoint_dir, "????-??-??")))
+
+
+def read_checkpoint(checkpoint_dir, date=None):
+    """
+    (snapshot, results) for the latest checkpoint not after date (default, the latest), None if there is none.
+    results are (returns, equity_curve, trades_df, positions_df) up to the snapshot, what run(prefix=) takes.
+    """
+    dates = [d for d in checkpoint_dates(checkpoint_dir) if date is None or d <= pd.Timestamp(date)]
+    if not dates:
+        return None
+    paths = [os.path.join(checkpoint_dir, f"{d:%Y-%m-%d}") for d in dates]
+    equity_curve, trades, positions = (
+        pd.concat([pd.read_parquet(os.path.join(path, f"{name}.parquet")) for path in paths])
+        for name in ["equity_curve", "trades", "positions"]
+    )
+    equity_curve = equity_curve["Market Value"]
+    results = equity_curve.pct_change().dropna(), equity_curve, trades.reset_index(drop=True), positions.reset_index(drop=True)
+    return EngineSnapshot.load(os.path.join(paths[-1], "snapshot.npz")), results
+
+
+if __name__ == '__main__':
+    from simulation.StrategyExecution import BacktestEngine, TransactionCostModel, run_forks
+    from utils.helper_functions import build_fund_registry
+
+    fund = build_fund_registry("2020-01-01", "2024-12-31")["Querido Capital Fund 1"]
+    tickers = sorted({t for strat, _ in fund.capital_allocation.values() for t in strat.tickers})
+    engine = BacktestEngine(tickers, fund, TransactionCostModel(), "2020-01-01", "2022-12-30")
+    engine.run(checkpoint_every=252, checkpoint_dir="checkpoints/fund_1")
+
+    # What-if continuations of the same 2020-2022 history under different costs
+    snapshot, prefix = read_checkpoint("checkpoints/fund_1")
+    forks = run_forks(snapshot, prefix, {
+        "Base": {"strategy": fund, "tickers": tickers},
+        "High Slippage": {"strategy": fund, "tickers": tickers, "slippage": 0.005},
+    }, end_date="2024-12-31")
+    for name, (returns, equity_curve, trades, positions) in forks.items():
+        print(name, equity_curve.iloc[-1])
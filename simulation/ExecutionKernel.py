@@ -0,0 +1,53 @@
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional, the kernel runs as plain NumPy without it
+    njit = None
+
+
+def _execute_trades(trade_weights, prices, holdings, cash, slippage, commission):
+    """
+    Checks and fills one bar of trades for every ticker at once.
+    trade_weights, prices and holdings are aligned arrays, trade weights are fractions of the whole book.
+    Sells settle first and fund the buys. If any sell exceeds holdings or the buys can't be paid for,
+    nothing is filled and ok is False.
+    Returns (ok, new_holdings, new_cash, quantities, exec_prices).
+    """
+    portfolio_val = cash + np.sum(holdings * prices)
+    sells = trade_weights < 0
+    buys = trade_weights > 0
+    trade_values = np.abs(trade_weights) * portfolio_val
+    commissions = trade_values * commission
+    exec_prices = np.where(sells, prices * (1 - slippage), prices * (1 + slippage))
+
+    # Sells need shares at the signal price (slippage comes off the proceeds), buys pay the execution price
+    quantities = np.where(sells, trade_values / prices, trade_values / exec_prices)
+    quantities = np.where(buys | sells, quantities, 0.0)
+    if np.any(sells & (holdings < quantities * (1 - 1e-9))):
+        return False, holdings, cash, quantities, exec_prices
+    quantities = np.where(sells, np.minimum(quantities, holdings), quantities)  # Closing out, absorb float rounding
+
+    # Cash only falls as buys fill, so paying for the last buy is the same as paying for all of them
+    cash_after_sells = cash + np.sum(np.where(sells, quantities * exec_prices - commissions, 0.0))
+    buy_cost = np.sum(np.where(buys, trade_values + commissions, 0.0))
+    if cash_after_sells < buy_cost:
+        return False, holdings, cash, quantities, exec_prices
+
+    new_holdings = holdings + np.where(buys, quantities, -quantities)
+    return True, new_holdings, cash_after_sells - buy_cost, quantities, exec_prices
+
+
+execute_trades = njit(cache=True)(_execute_trades) if njit is not None else _execute_trades
+
+
+if __name__ == "__main__":
+    ok, holdings, cash, quantities, exec_prices = execute_trades(
+        np.array([0.3, -0.2, 0.0]),
+        np.array([100.0, 50.0, 20.0]),
+        np.array([0.0, 800.0, 100.0]),
+        50000.0,
+        0.001,
+        0.0005
+    )
+    print(ok, holdings, cash)
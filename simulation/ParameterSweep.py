@@ -0,0 +1,177 @@
+import os
+import math
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from datasets.GetSeries import GetSeries
+from simulation.StrategyExecution import TransactionCostModel, vectorized_backtest, run_benchmark, build_stats
+from strategies.InitialiseStrategy import InitialiseStrategy
+from strategies.signal_generation.BuyAndHoldStrategy import BuyAndHoldStrategy
+from strategies.signal_generation.MomentumStrategy import MomentumStrategy
+from strategies.allocations.EqualWeightAllocator import EqualWeightAllocator
+from strategies.allocations.VolatilityScaledAllocator import VolatilityScaledAllocator
+
+# Set once per worker process by _init_worker so the price panel is shipped once, not once per task
+_worker_prices = None
+_worker_benchmark = None
+
+
+class ParameterSweep:
+    """
+    Backtests every combination in a parameter grid against one shared price panel.
+    Signal panels are built in batches (settings sharing a lookback share their rolling statistics),
+    simulated with the vectorised full-rebalance engine, and run over a pool of worker processes.
+    """
+    def __init__(
+        self,
+        strategy_cls,
+        allocator_cls,
+        tickers,
+        start,
+        end,
+        param_grid: dict,
+        allocator_kwargs=None,
+        benchmark_ticker="SPY",
+        benchmark_strat=None,
+        slippage=0.001,
+        commission=0.0005,
+        cash_buffer=0.02,
+        initial_cash=100000,
+        max_workers=None
+    ):
+        self.strategy_cls = strategy_cls
+        self.allocator_cls = allocator_cls
+        self.tickers = tickers
+        self.start = start
+        self.end = end
+        self.param_grid = param_grid  # {param name: [values]}
+        self.allocator_kwargs = allocator_kwargs or {}
+        self.benchmark_ticker = benchmark_ticker
+        self.benchmark_strat = benchmark_strat
+        self.slippage = slippage
+        self.commission = commission
+        self.cash_buffer = cash_buffer
+        self.initial_cash = initial_cash
+        self.max_workers = max_workers or os.cpu_count()
+
+    def param_sets(self) -> list:
+        names = list(self.param_grid)
+        return [dict(zip(names, values)) for values in itertools.product(*self.param_grid.values())]
+
+    def run(self) -> pd.DataFrame:
+        """
+        Returns one row per parameter set: the parameters followed by PerformanceStats.to_dict() metrics.
+        """
+        rows = self._map(_run_chunk, with_benchmark=True)
+        return pd.DataFrame(rows)
+
+    def returns(self) -> pd.DataFrame:
+        """
+        Full-history daily returns for every parameter set, as a Date x parameter-set frame.
+        Columns are positions in param_sets().
+        """
+        series = self._map(_returns_chunk, with_benchmark=False)
+        return pd.concat(series, axis=1, keys=range(len(series)))
+
+    def _map(self, chunk_fn, with_benchmark):
+        prices = GetSeries(ticker=self.tickers, start=self.start, end=self.end).fetch_prices()
+        benchmark_returns = self._benchmark_returns() if with_benchmark else None
+        param_sets = self.param_sets()
+
+        # Keep settings that share a lookback in the same chunk so their signals are batched together
+        order = sorted(range(len(param_sets)), key=lambda i: tuple(sorted(param_sets[i].items())))
+        chunk_size = max(1, math.ceil(len(order) / (self.max_workers * 4)))
+        chunks = [[param_sets[i] for i in order[j:j + chunk_size]] for j in range(0, len(order), chunk_size)]
+        config = {
+            "strategy_cls": self.strategy_cls,
+            "allocator_cls": self.allocator_cls,
+            "allocator_kwargs": self.allocator_kwargs,
+            "slippage": self.slippage,
+            "commission": self.commission,
+            "cash_buffer": self.cash_buffer,
+            "initial_cash": self.initial_cash,
+        }
+
+        with ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(prices, benchmark_returns)
+        ) as pool:
+            sorted_results = [item for chunk_items in pool.map(chunk_fn, chunks, itertools.repeat(config)) for item in chunk_items]
+        # Back to param_sets() order
+        results = [None] * len(order)
+        for i, item in zip(order, sorted_results):
+            results[i] = item
+        return results
+
+    def _benchmark_returns(self):
+        benchmark_strat = self.benchmark_strat or InitialiseStrategy(
+            strategy_cls=BuyAndHoldStrategy,
+            allocator_cls=EqualWeightAllocator,
+            tickers=self.benchmark_ticker,
+            start=self.start,
+            end=self.end
+        )
+        return run_benchmark(
+            self.benchmark_ticker, benchmark_strat, self.start, self.end,
+            slippage=self.slippage, commission=self.commission
+        )
+
+
+def _init_worker(prices, benchmark_returns):
+    global _worker_prices, _worker_benchmark
+    _worker_prices = prices
+    _worker_benchmark = benchmark_returns
+
+
+def simulate_param_sets(prices, param_sets, config):
+    """
+    Vectorised backtests for a batch of parameter sets, returns [(params, backtest results)] in order.
+    """
+    strategy_cls = config["strategy_cls"]
+    allocator = config["allocator_cls"](**config["allocator_kwargs"])
+    cost_model = TransactionCostModel(slippage=config["slippage"], trading_fee=config["commission"])
+    signal_panels = strategy_cls.generate_signal_panels(prices, param_sets)
+    return [
+        (params, vectorized_backtest(
+            prices,
+            allocator.allocate_panel(signal_panel),
+            cost_model=cost_model,
+            initial_cash=config["initial_cash"],
+            cash_buffer=config["cash_buffer"],
+            slippage=config["slippage"]
+        ))
+        for params, signal_panel in zip(param_sets, signal_panels)
+    ]
+
+
+def _returns_chunk(param_sets, config):
+    return [results["returns"] for _, results in simulate_param_sets(_worker_prices, param_sets, config)]
+
+
+def _run_chunk(param_sets, config):
+    rows = []
+    for params, results in simulate_param_sets(_worker_prices, param_sets, config):
+        stats = build_stats(results["returns"], _worker_benchmark, results["trades"], results["positions"])
+        rows.append({**params, **stats.to_dict()})
+    return rows
+
+
+if __name__ == '__main__':
+    tickers = ["AAPL", "MSFT", "GOOG", "TSLA"]
+    start = "2020-01-01"
+    end = "2024-12-31"
+    vol_data = GetSeries(ticker=tickers, start=start, end=end).fetch_volatility()
+    sweep = ParameterSweep(
+        strategy_cls=MomentumStrategy,
+        allocator_cls=VolatilityScaledAllocator,
+        tickers=tickers,
+        start=start,
+        end=end,
+        param_grid={"lookback": [10, 20, 60, 120], "threshold": [0.0, 0.01, 0.02, 0.05]},
+        allocator_kwargs={"vol_data": vol_data}
+    )
+    results = sweep.run()
+    print(results.sort_values("Sharpe Ratio", ascending=False).head(10))
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+
+class PortfolioLedger:
+    """
+    Preallocated T x N record of quantities, market values and weights plus a cash vector.
+    The engine writes one row per bar by index; DataFrames are only built when asked for.
+    """
+    def __init__(self, dates, tickers):
+        self.dates = pd.DatetimeIndex(dates)
+        self.tickers = list(tickers)
+        n_dates, n_tickers = len(self.dates), len(self.tickers)
+        self.quantities = np.zeros((n_dates, n_tickers))
+        self.market_values = np.zeros((n_dates, n_tickers))
+        self.weights = np.zeros((n_dates, n_tickers))
+        self.cash = np.zeros(n_dates)
+        self.cash_weights = np.zeros(n_dates)
+
+    def record(self, t: int, quantities: np.ndarray, prices: np.ndarray, cash: float):
+        market_values = np.multiply(quantities, prices, out=self.market_values[t])
+        self.quantities[t] = quantities
+        self.cash[t] = cash
+        total_value = market_values.sum() + cash
+        if total_value != 0:
+            np.divide(market_values, total_value, out=self.weights[t])
+            self.cash_weights[t] = cash / total_value
+        else:
+            self.weights[t] = 0.0
+            self.cash_weights[t] = 0.0
+
+    def total_value(self) -> np.ndarray:
+        return self.market_values.sum(axis=1) + self.cash
+
+    def equity_curve(self) -> pd.Series:
+        return pd.Series(self.total_value(), index=self.dates, name="Market Value").rename_axis("Date")
+
+    def to_positions_frame(self, start=0, stop=None) -> pd.DataFrame:
+        """
+        Long Date/Ticker/Market Value/Weight frame with a CASH row per date, for bars [start, stop) (default, all).
+        A ticker appears from the first bar it is held, matching the engine's old per-bar log.
+        """
+        held = np.maximum.accumulate(self.quantities[:stop] != 0, axis=0)[start:]
+        rows, cols = np.nonzero(held)
+        rows += start
+        positions = pd.DataFrame({
+            "Date": self.dates[rows],
+            "Ticker": np.asarray(self.tickers, dtype=object)[cols],
+            "Market Value": self.market_values[rows, cols],
+            "Weight": self.weights[rows, cols],
+        })
+        cash = pd.DataFrame({
+            "Date": self.dates[start:stop],
+            "Ticker": "CASH",
+            "Market Value": self.cash[start:stop],
+            "Weight": self.cash_weights[start:stop],
+        })
+        # Stable sort keeps tickers in universe order with CASH last within each date
+        return pd.concat([positions, cash], ignore_index=True).sort_values("Date", kind="stable", ignore_index=True)
@@ -0,0 +1,120 @@
+import os
+import json
+import glob
+import shutil
+import hashlib
+import functools
+import pandas as pd
+from simulation.EngineSnapshot import EngineSnapshot
+
+CACHE_DIR = os.environ.get("QAM_RESULTS_CACHE", os.path.join(os.path.dirname(__file__), "cache", "results"))
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Packages whose code determines a backtest's output, any edit to them invalidates stored results
+SOURCE_PACKAGES = ["datasets", "simulation", "stats", "strategies", "utils"]
+
+
+@functools.lru_cache(maxsize=None)
+def code_version() -> str:
+    digest = hashlib.sha256()
+    for package in SOURCE_PACKAGES:
+        for path in sorted(glob.glob(os.path.join(ROOT_DIR, package, "**", "*.py"), recursive=True)):
+            digest.update(os.path.relpath(path, ROOT_DIR).encode())
+            with open(path, "rb") as f:
+                digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+class ResultsStore:
+    """
+    Backtest outputs (returns, equity curve, trades, positions) persisted as zstd Parquet, one directory per
+    run keyed by StrategyExecution.results_key. A fund's manifest maps its config to the runs it is made of,
+    so a cold process reads a fund's runs without building its strategies or re-simulating anything.
+    """
+    frames = ["returns", "equity_curve", "trades", "positions"]
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def get(self, key):
+        """
+        (returns, equity_curve, trades_df, positions_df) or None if the run isn't stored.
+        """
+        if not self.contains(key):
+            return None
+        path = self._path(key)
+        returns, equity_curve, trades, positions = (pd.read_parquet(os.path.join(path, f"{name}.parquet")) for name in self.frames)
+        return returns["Market Value"], equity_curve["Market Value"], trades, positions
+
+    def contains(self, key):
+        return os.path.exists(os.path.join(self._path(key), "positions.parquet"))
+
+    def put(self, key, results, snapshot=None, lineage=None):
+        """
+        snapshot: EngineSnapshot stored beside the run so a later run of the same lineage can resume from it.
+        """
+        returns, equity_curve, trades, positions = results
+        # Written to a scratch directory and renamed into place, so readers see a complete run or nothing
+        tmp_path = f"{self._path(key)}.{os.getpid()}.tmp"
+        os.makedirs(tmp_path, exist_ok=True)
+        for name, frame in zip(self.frames, [returns.to_frame("Market Value"), equity_curve.to_frame("Market Value"), trades, positions]):
+            frame.to_parquet(os.path.join(tmp_path, f"{name}.parquet"), compression="zstd")
+        if snapshot is not None:
+            snapshot.save(os.path.join(tmp_path, "snapshot.npz"))
+        try:
+            os.rename(tmp_path, self._path(key))
+        except OSError:
+            shutil.rmtree(tmp_path, ignore_errors=True)  # Another process stored the same run first
+        if snapshot is not None and lineage is not None:
+            self._mark(lineage, snapshot.date, key)
+
+    def latest(self, lineage, end):
+        """
+        (snapshot, results) for the stored EngineSnapshot in a lineage with the latest date not after end, results
+        being the run it was stored with, what BacktestEngine.run takes as resume_from and prefix. None if there is none.
+        """
+        marks = sorted(glob.glob(os.path.join(self.cache_dir, "lineage", lineage, "????-??-??")), reverse=True)
+        for mark in marks:
+            if pd.Timestamp(os.path.basename(mark)) > pd.Timestamp(end):
+                continue
+            with open(mark) as f:
+                key = f.read().strip()
+            path = os.path.join(self._path(key), "snapshot.npz")
+            if not os.path.exists(path):
+                continue  # The run was cleared from the cache
+            try:
+                snapshot = EngineSnapshot.load(path)
+            except ValueError:
+                continue  # Written by an engine with a different snapshot layout
+            return snapshot, self.get(key)
+        return None
+
+    def _mark(self, lineage, date, key):
+        # One file per state date naming the run it belongs to, latest() scans these newest first
+        path = os.path.join(self.cache_dir, "lineage", lineage)
+        os.makedirs(path, exist_ok=True)
+        mark = os.path.join(path, pd.Timestamp(date).strftime("%Y-%m-%d"))
+        with open(f"{mark}.{os.getpid()}.tmp", "w") as f:
+            f.write(key)
+        os.replace(f"{mark}.{os.getpid()}.tmp", mark)
+
+    def get_manifest(self, key):
+        """
+        {"composite": [results key, benchmark key], "strategies": {name: [results key, benchmark key]}} or None.
+        """
+        path = os.path.join(self.cache_dir, "funds", f"{key}.json")
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def put_manifest(self, key, manifest: dict):
+        # Which stored runs make up one fund, keyed by StrategyExecution.fund_key
+        path = os.path.join(self.cache_dir, "funds", f"{key}.json")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.{os.getpid()}.tmp", "w") as f:
+            json.dump(manifest, f)
+        os.replace(f"{path}.{os.getpid()}.tmp", path)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key)
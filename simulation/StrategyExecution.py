@@ -1,3 +1,7 @@
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
 from datasets.GetSeries import GetSeries
 from strategies.signal_generation.MomentumStrategy import MomentumStrategy
@@ -9,6 +13,12 @@ from strategies.StrategyEnsemble import StrategyEnsemble
 from strategies.InitialiseStrategy import InitialiseStrategy
 from strategies.rebalancing.NaiveFullRebalancer import NaiveFullRebalancer
 from stats.PerformanceStats import PerformanceStats
+from simulation.PortfolioLedger import PortfolioLedger
+from simulation.ExecutionKernel import execute_trades
+from simulation.BenchmarkCache import BenchmarkCache
+from simulation.ResultsStore import ResultsStore, code_version
+from simulation.EngineSnapshot import EngineSnapshot, write_checkpoint, checkpoint_dates
+from utils.cache_keys import config_key, as_date
 
 
 class TransactionCostModel:
@@ -33,7 +43,8 @@ class BacktestEngine:
         initial_cash=100000,
         slippage=0.001,
         commission=0.0005,
-        benchmark_strat=None
+        benchmark_strat=None,
+        vectorized=False
     ):
         self.tickers = tickers
         self.strategy = self._wrap_if_single(strategy)
@@ -41,15 +52,27 @@ class BacktestEngine:
         self.cost_model = cost_model
         self.start_date = start_date
         self.end_date = end_date
-        self.cash = initial_cash
+        self.cash = float(initial_cash)  # One type for execute_trades, an int would compile a second specialisation
         self.rebalancer = rebalancer
         self.cash_buffer = cash_buffer
-        self.holdings = {}  # {ticker: quantity}
+        self.holdings = None  # Quantities aligned with the ledger's tickers, sized once prices are known
         self.slippage = slippage
         self.commission = commission
         self.execution_log = []
         self.trade_log = []
-        self.account_history = []
+        self.ledger = None  # PortfolioLedger, sized once prices are known
+        self.settled = None  # EngineSnapshot at the last settled bar, see run()
+        self.resume_from = None  # EngineSnapshot run() continues from, see from_snapshot()
+        self.prefix = None  # Results of the run resume_from was taken from
+        self.initial_cash = initial_cash
+        self.vectorized = vectorized  # Run the whole history as matrix operations, full rebalancing only
+        if vectorized and rebalancer is not NaiveFullRebalancer:
+            raise ValueError("Vectorized backtests require NaiveFullRebalancer")
+
+    @property
+    def strategy_names(self) -> str:
+        # Trades record which strategies were running, the same string whether the run was simulated or restored
+        return ", ".join(self.strategy.capital_allocation)
 
     def _wrap_if_single(self, strat):
         if strat is None:
@@ -58,11 +81,13 @@ class BacktestEngine:
             return strat  # Already a StrategyEnsemble
         return StrategyEnsemble({"wrapped_strategy": (strat, 1.0)})
 
-    def get_rebalanced_weights(self, target_weights):
+    def get_rebalanced_weights(self, target_weights, prices: np.ndarray):
         """
         Rebalances the portfolio to match the target weights.
         """
-        trades, rebalanced_weights = self.rebalancer().rebalance(self.holdings, target_weights)
+        # Hold back the cash buffer to ensure liquidity and enough cash for trades
+        target_weights = {ticker: w * (1 - self.cash_buffer) for ticker, w in target_weights.items()}
+        trades, rebalanced_weights = self.rebalancer().rebalance(self.get_weights(prices), target_weights)
         return trades, rebalanced_weights
 
     def fetch_series(self, tickers, start, end):
@@ -71,100 +96,97 @@ class BacktestEngine:
         """
         return GetSeries(ticker=tickers, start=start, end=end)
 
-    def portfolio_value(self, prices: pd.Series) -> float:
-        equity = sum(
-            qty * prices.get(ticker, 0) for ticker, qty in self.holdings.items()
-        )
-        return self.cash + equity
-
-    def get_weights(self, prices: pd.Series) -> float:
-        equity = sum(
-            qty * prices.get(ticker, 0) for ticker, qty in self.holdings.items()
-        )
-        return self.cash + equity
-
-    def _process_trades(self, trades: dict, prices: pd.Series, simulate: bool = False) -> bool | dict:
-        temp_cash = self.cash
-        temp_holdings = self.holdings.copy()
-        usable_portfolio_val = self.portfolio_value(prices) * (1 - self.cash_buffer)  # Cash buffer to ensure liquidity and enough cash for trades
-        portfolio_val = usable_portfolio_val
-        executed_info = {}  # {ticker: {"qty": X, "price": Y}}
-
-        # --- Execute sells first ---
-        for ticker, trade_weight in trades.items():
-            if trade_weight >= 0 or ticker == "CASH":
-                continue
-            trade_value = abs(trade_weight) * portfolio_val
-            exec_price = prices[ticker] * (1 - self.slippage)
-            commission = trade_value * self.commission
-            # qty = int(trade_value // exec_price)
-            qty = trade_value / exec_price
-
-            if temp_holdings.get(ticker, 0) < qty:
-                return False if simulate else None
-
-            if not simulate:
-                self.cash += trade_value - commission
-                self.holdings[ticker] -= qty
-            else:
-                temp_cash += trade_value - commission
-                temp_holdings[ticker] -= qty
+    def portfolio_value(self, prices: np.ndarray) -> float:
+        return self.cash + float(self.holdings @ prices)
 
-            executed_info[ticker] = {"qty": qty, "price": exec_price}
+    def get_weights(self, prices: np.ndarray) -> dict:
+        total_value = self.portfolio_value(prices)
+        if total_value == 0:
+            return {}
+        return dict(zip(self.ledger.tickers, self.holdings * prices / total_value))
 
-        # --- Execute buys ---
+    def _process_trades(self, trades: dict, prices: np.ndarray) -> dict | None:
+        """
+        Checks and fills every trade for the bar in one pass, returns {ticker: {"qty": X, "price": Y}}
+        or None if the rebalance isn't feasible.
+        """
+        trade_weights = np.zeros(len(self.ledger.tickers))
         for ticker, trade_weight in trades.items():
-            if trade_weight <= 0 or ticker == "CASH":
-                continue
-            trade_value = trade_weight * portfolio_val
-            exec_price = prices[ticker] * (1 + self.slippage)
-            commission = trade_value * self.commission
-            total_cost = trade_value + commission
-            # qty = int(trade_value // exec_price)
-            qty = trade_value / exec_price
-
-            if temp_cash < total_cost:
-                print(f"Ticker: {ticker}: Cash shortfall: {temp_cash / total_cost}")
-                return False if simulate else None
-
-            if not simulate:
-                self.cash -= total_cost
-                self.holdings[ticker] = self.holdings.get(ticker, 0) + qty
-            else:
-                temp_cash -= total_cost
-                temp_holdings[ticker] = temp_holdings.get(ticker, 0) + qty
-
-            executed_info[ticker] = {"qty": qty, "price": exec_price}
-
-        return True if simulate else executed_info
+            if ticker != "CASH":
+                trade_weights[self._ticker_index[ticker]] = trade_weight
 
+        ok, holdings, cash, quantities, exec_prices = execute_trades(
+            trade_weights, prices, self.holdings, self.cash, self.slippage, self.commission
+        )
+        if not ok:
+            return None
+        self.holdings, self.cash = holdings, cash
+        return {
+            self.ledger.tickers[i]: {"qty": quantities[i], "price": exec_prices[i]}
+            for i in np.flatnonzero(trade_weights)
+        }
 
-    def run(self):
+    def run(self, resume_from=None, prefix=None, settled_before=None, checkpoint_every=None, checkpoint_dir=None):
+        """
+        resume_from: EngineSnapshot to continue from (default self.resume_from, see from_snapshot), with prefix
+        the results of the run it was taken from (ResultsStore.latest and read_checkpoint return both). Bars up
+        to the snapshot are read from prefix rather than simulated, only bars after its date are run. A snapshot
+        whose closes have since been re-adjusted for a dividend or split is ignored and the whole history is run.
+        settled_before: self.settled is the snapshot at the last bar dated before this (default, the last bar),
+        so a resume point never includes a bar whose prices may still change.
+        checkpoint_every: also write a checkpoint to checkpoint_dir every this many simulated bars, each holding
+        a snapshot and only the bars since the checkpoint before it (see EngineSnapshot.write_checkpoint).
+        """
+        if checkpoint_every and not checkpoint_dir:
+            raise ValueError("checkpoint_every needs a checkpoint_dir to write to")
         print('Running backtest...')
+        resume_from = resume_from or self.resume_from
+        prefix = self.prefix if prefix is None else prefix
+        if resume_from is not None and prefix is None:
+            raise ValueError("Resuming from a snapshot needs the results of the run it was taken from (prefix)")
         prices = self.fetch_series(self.tickers, self.start_date, self.end_date).fetch_prices()
+        if self.vectorized:
+            if resume_from is not None:
+                raise ValueError("Vectorized backtests can't be resumed")
+            return self._run_vectorized(prices)
         # returns = self.fetch_series(self.tickers, self.start_date, self.end_date).fetch_returns()
         # trade_log = []
-        for date in prices.index:
+        self.ledger = PortfolioLedger(prices.index, prices.columns)
+        self._ticker_index = {ticker: i for i, ticker in enumerate(self.ledger.tickers)}
+        self.holdings = np.zeros(len(self.ledger.tickers))
+        price_matrix = self._price_matrix = prices.to_numpy()
+        if resume_from is not None and not resume_from.priced_like(prices):
+            # Re-adjusted since the snapshot was taken, its prefix would no longer match a full run
+            print('Prices have been re-adjusted since the snapshot, running the full history...')
+            resume_from = None
+        first_bar = self._restore(resume_from, prefix, prices) if resume_from is not None else 0
+        settled_bar = prices.index.searchsorted(pd.Timestamp(settled_before)) - 1 if settled_before else len(prices) - 1
+        # A settled bar among the restored ones can only be the snapshot's own
+        self.settled = resume_from if first_bar and settled_bar == first_bar - 1 else None
+        if checkpoint_every and first_bar < len(prices):
+            # Each checkpoint adds the bars since the one before it in checkpoint_dir, so the chain stays complete
+            written = [d for d in checkpoint_dates(checkpoint_dir) if d < prices.index[first_bar]]
+            segment_start = prices.index.searchsorted(written[-1], side="right") if written else 0
+        for t, date in enumerate(prices.index[first_bar:], start=first_bar):
             # Generate positions using the strategy (using data to the current date)
             for strat, strat_params in self.strategy.capital_allocation.items():
                 strat_instance, capital_fraction = strat_params
                 strat_instance.end = date
             # Generate target positions
             target_weights = self.strategy.aggregate_allocations()
-            trades, rebalanced_weights = self.get_rebalanced_weights(target_weights)
+            trades, rebalanced_weights = self.get_rebalanced_weights(target_weights, price_matrix[t])
             # Execute trades
-            if self._process_trades(trades, prices.loc[date], simulate=True):
-                executed_info = self._process_trades(trades, prices.loc[date], simulate=False)
-
+            executed_info = self._process_trades(trades, price_matrix[t])
+            if executed_info is not None:
                 for ticker, info in executed_info.items():
                     self._log_trade(
                         date=date,
                         ticker=ticker,
                         side="BUY" if trades[ticker] > 0 else "SELL",
                         quantity=info["qty"],
-                        signal_price=prices.loc[date, ticker],
+                        signal_price=price_matrix[t, self._ticker_index[ticker]],
                         exec_price=info["price"],
-                        strategy=self.strategy.capital_allocation  # pass in current strategy name
+                        strategy=self.strategy_names
                     )
             else:
                 self.execution_log.append({
@@ -172,12 +194,15 @@ class BacktestEngine:
                     "Note": "Rebalance skipped — insufficient capital or holdings"
                 })
             # Log account state
-            self._log_account(date, prices.loc[date])
+            self._log_account(t, price_matrix[t])
+            if t == settled_bar:
+                self.settled = self.snapshot(t)
+            if checkpoint_every and (t + 1 - first_bar) % checkpoint_every == 0:
+                write_checkpoint(checkpoint_dir, self.snapshot(t), self._segment(segment_start, t + 1))
+                segment_start = t + 1
         print('Backtest completed.')
         # --- Extract equity curve and returns ---
-        account_df = pd.DataFrame(self.account_history).set_index("Date").sort_index()
-        # Compute equity curve by summing market value per day
-        equity_curve = account_df.groupby("Date")["Market Value"].sum().sort_index()
+        equity_curve = self.ledger.equity_curve()
         # Compute returns
         returns = equity_curve.pct_change().dropna()
 
@@ -185,11 +210,108 @@ class BacktestEngine:
         trades_df = pd.DataFrame(self.trade_log)
 
         # Reconstruct positions_df
-        # You’ll want to store and return exposures during _log_account
-        positions_df = pd.DataFrame(self.account_history)  # Todo: Why do weights not sum to 100%
+        positions_df = self.ledger.to_positions_frame()  # Todo: Why do weights not sum to 100%
 
         return returns, equity_curve, trades_df, positions_df
 
+    def snapshot(self, t=None) -> EngineSnapshot:
+        """
+        Engine state after bar t (default, the last bar), everything a continuation needs and nothing it can re-derive.
+        """
+        t = len(self.ledger.dates) - 1 if t is None else t
+        return EngineSnapshot(
+            self.ledger.dates[t],
+            self.ledger.tickers,
+            self.ledger.quantities[t].copy(),
+            self.ledger.cash[t],
+            self._price_matrix[t].copy(),
+            {
+                "start_date": as_date(self.start_date),
+                "initial_cash": self.initial_cash,
+                "cash_buffer": self.cash_buffer,
+                "slippage": self.slippage,
+                "commission": self.commission,
+                "rebalancer": f"{self.rebalancer.__module__}.{self.rebalancer.__qualname__}",
+                "strategy": config_key(self.strategy),
+            }
+        )
+
+    def _segment(self, start, stop):
+        # (equity_curve, trades_df, positions_df) for bars [start, stop), what one checkpoint adds to the history
+        dates = self.ledger.dates[start:stop]
+        equity_curve = self.ledger.equity_curve().iloc[start:stop]
+        trades = pd.DataFrame([row for row in self.trade_log if dates[0] <= row["Date"] <= dates[-1]])
+        return equity_curve, trades, self.ledger.to_positions_frame(start, stop)
+
+    @classmethod
+    def from_snapshot(cls, snapshot, prefix, strategy, end_date, tickers=None, **overrides):
+        """
+        Engine continuing a snapshot's run to end_date, prefix being that run's results (see run()). The strategy
+        and any overridden settings (costs, cash buffer, rebalancer) may differ from the snapshotted run's, so
+        what-if forks share one simulated prefix.
+        """
+        kwargs = {**snapshot.engine_kwargs(), **overrides}
+        cost_model = TransactionCostModel(slippage=kwargs["slippage"], trading_fee=kwargs["commission"])
+        engine = cls(
+            snapshot.tickers if tickers is None else tickers, strategy, cost_model,
+            snapshot.settings["start_date"], end_date, **kwargs
+        )
+        engine.resume_from, engine.prefix = snapshot, prefix
+        return engine
+
+    def _restore(self, snapshot, prefix, prices: pd.DataFrame) -> int:
+        """
+        Writes the prefix's bars up to the snapshot into the ledger and picks up the snapshot's holdings and
+        cash and the prefix's trades. Returns the first bar left to simulate. The execution log only covers
+        simulated bars.
+        """
+        held = snapshot.holdings[snapshot.holdings != 0].index
+        missing = sorted(set(held) - set(self.ledger.tickers))
+        if missing:
+            raise ValueError(f"Snapshot holds tickers this run can't price: {missing}")
+        first_bar = self.ledger.dates.searchsorted(snapshot.date, side="right")
+        dates = self.ledger.dates[:first_bar]
+        _, _, trades, positions = prefix
+        positions = positions[positions["Date"] <= snapshot.date]
+        # Quantities from the stored market values at the same closes (priced_like has checked them), restored
+        # onto this run's calendar, a bar missing from the prefix carries the previous bar's book
+        values = positions[positions["Ticker"] != "CASH"].pivot(index="Date", columns="Ticker", values="Market Value")
+        values.index = pd.DatetimeIndex(values.index).as_unit(dates.unit)
+        values = values.reindex(columns=self.ledger.tickers).fillna(0.0)
+        quantities = (values / prices.reindex(values.index)).where(values != 0, 0.0)
+        quantities = quantities.reindex(quantities.index.union(dates)).ffill().reindex(dates).fillna(0.0).to_numpy()
+        cash = positions[positions["Ticker"] == "CASH"].set_index("Date")["Market Value"]
+        cash.index = pd.DatetimeIndex(cash.index).as_unit(dates.unit)
+        cash = cash.reindex(cash.index.union(dates)).ffill().reindex(dates).fillna(self.initial_cash).to_numpy()
+        price_matrix = prices.to_numpy()
+        for t in range(first_bar):
+            self.ledger.record(t, quantities[t], price_matrix[t], cash[t])
+
+        self.holdings = snapshot.holdings.reindex(self.ledger.tickers, fill_value=0.0).to_numpy()
+        self.cash = snapshot.cash
+        # Dates in the price index's resolution, as the bars simulated after them are logged
+        trades = trades[trades["Date"] <= snapshot.date] if len(trades) else trades
+        self.trade_log = [{**row, "Date": pd.Timestamp(row["Date"]).as_unit(dates.unit)} for row in trades.to_dict("records")]
+        self.execution_log = []
+        return first_bar
+
+    def _run_vectorized(self, prices: pd.DataFrame):
+        target_weights = self.strategy.weight_panel()
+        # Use each bar's latest available weights, tickers the engine can't price are dropped
+        target_weights = target_weights.reindex(prices.index, method="ffill").reindex(columns=prices.columns)
+        results = vectorized_backtest(
+            prices,
+            target_weights.fillna(0.0),
+            cost_model=self.cost_model,
+            initial_cash=self.initial_cash,
+            cash_buffer=self.cash_buffer,
+            slippage=self.slippage,
+            strategy=self.strategy_names
+        )
+        self.ledger = results.pop("ledger")
+        print('Backtest completed.')
+        return results["returns"], results["equity_curve"], results["trades"], results["positions"]
+
     def _log_trade(self, date, ticker, side, quantity, signal_price, exec_price, strategy):
         self.trade_log.append({
             "Date": date,
@@ -201,60 +323,177 @@ class BacktestEngine:
             "Strategy": strategy
         })
 
-    def _log_account(self, date, prices):
-        positions = []
-        # Log positions for each asset
-        for ticker, qty in self.holdings.items():
-            if ticker in prices:
-                market_value = qty * prices[ticker]
-                positions.append({
-                    "Date": date,
-                    "Ticker": ticker,
-                    "Market Value": market_value,
-                    "Weight": None  # will fill in below if desired
-                })
+    def _log_account(self, t, prices: np.ndarray):
+        self.ledger.record(t, self.holdings, prices, self.cash)
+
+
+def vectorized_backtest(prices, target_weights, cost_model, initial_cash=100000, cash_buffer=0.02, slippage=0.001, strategy=None):
+    """
+    Full-rebalance backtest of a Date x ticker target weight panel as whole-history matrix operations.
+    Holdings are rebalanced to target * (1 - cash_buffer) at each close, earn the next bar's asset returns,
+    and pay cost_model.apply_costs on the change in weights. Drift between bars isn't traded and fills are
+    never rejected, so results approximate the event loop in run() rather than reproduce it exactly.
+    """
+    price_matrix = prices.to_numpy()
+    asset_returns = np.zeros_like(price_matrix)
+    asset_returns[1:] = price_matrix[1:] / price_matrix[:-1] - 1
+
+    held_weights = target_weights.to_numpy() * (1 - cash_buffer)
+    # Prepend the all-cash starting book so the first bar pays for building the portfolio
+    start_book = pd.DataFrame(0.0, index=[prices.index[0] - pd.Timedelta(days=1)], columns=prices.columns)
+    weight_frame = pd.concat([start_book, pd.DataFrame(held_weights, index=prices.index, columns=prices.columns)])
+    costs = cost_model.apply_costs(weight_frame).iloc[1:].sum(axis=1).to_numpy()
+
+    previous_weights = np.vstack([np.zeros(len(prices.columns)), held_weights[:-1]])
+    gross_returns = (previous_weights * asset_returns).sum(axis=1)
+    equity = initial_cash * np.cumprod(1 + gross_returns - costs)
+    pre_trade_value = np.concatenate([[initial_cash], equity[:-1]]) * (1 + gross_returns)
+
+    ledger = PortfolioLedger(prices.index, prices.columns)
+    ledger.market_values[:] = held_weights * equity[:, None]
+    ledger.quantities[:] = ledger.market_values / price_matrix
+    ledger.cash[:] = equity - ledger.market_values.sum(axis=1)
+    ledger.weights[:] = held_weights
+    ledger.cash_weights[:] = ledger.cash / equity
+
+    weight_changes = held_weights - previous_weights
+    rows, cols = np.nonzero(np.abs(weight_changes) > 1e-12)
+    changes = weight_changes[rows, cols]
+    signal_prices = price_matrix[rows, cols]
+    exec_prices = signal_prices * (1 + np.sign(changes) * slippage)
+    trades = pd.DataFrame({
+        "Date": prices.index[rows],
+        "Ticker": np.asarray(prices.columns, dtype=object)[cols],
+        "Side": np.where(changes > 0, "BUY", "SELL"),
+        # Buys spend the trade value at the execution price, sells raise it at the signal price less slippage
+        "Quantity": np.abs(changes) * pre_trade_value[rows] / np.where(changes > 0, exec_prices, signal_prices),
+        "Signal Price": signal_prices,
+        "Execution Price": exec_prices,
+        "Strategy": [strategy] * len(rows)
+    })
+
+    equity_curve = ledger.equity_curve()
+    return {
+        "returns": equity_curve.pct_change().dropna(),
+        "equity_curve": equity_curve,
+        "trades": trades,
+        "positions": ledger.to_positions_frame(),
+        "ledger": ledger
+    }
 
-        # Log cash as a separate position
-        positions.append({
-            "Date": date,
-            "Ticker": "CASH",
-            "Market Value": self.cash,
-            "Weight": None
-        })
-        # Calculate total value to compute weights
-        total_value = sum(p["Market Value"] for p in positions if p["Market Value"] is not None)
-        # Add weights
-        for pos in positions:
-            pos["Weight"] = pos["Market Value"] / total_value if total_value != 0 else 0.0
 
-        self.account_history.extend(positions)
+def run_engine(tickers, strat, start_date, end_date, slippage=0.001, commission=0.0005, vectorized=False):
+    """
+    Runs a single backtest and returns (returns, equity_curve, trades_df, positions_df).
+    Module level so independent runs can be scheduled on a process pool.
+    Runs already in the ResultsStore are read back rather than simulated, and an event-loop run whose
+    configuration was stored with an earlier end date resumes from it, simulating only the newer bars.
+    """
+    store = ResultsStore()
+    key = results_key(tickers, strat, start_date, end_date, slippage, commission, vectorized)
+    results = store.get(key)
+    if results is not None:
+        return results
+
+    cost_model = TransactionCostModel(slippage=slippage, trading_fee=commission)
+    engine = BacktestEngine(tickers, strat, cost_model, start_date, end_date, slippage=slippage, commission=commission, vectorized=vectorized)
+    if vectorized:
+        results = engine.run()  # Whole-history matrix operations, cheap enough to rerun
+        store.put(key, results)
+        return results
+    lineage = lineage_key(tickers, strat, start_date, slippage, commission)
+    # Today's bar can still move, so the state saved for later runs to resume from stops before it
+    resume_from, prefix = store.latest(lineage, end_date) or (None, None)
+    results = engine.run(resume_from=resume_from, prefix=prefix, settled_before=pd.Timestamp.today().normalize())
+    store.put(key, results, snapshot=engine.settled, lineage=lineage)
+    return results
+
+
+def run_fork(snapshot, prefix, strategy, end_date, tickers=None, **overrides):
+    """
+    One what-if continuation of a snapshot, see BacktestEngine.from_snapshot. Module level for process pools.
+    """
+    return BacktestEngine.from_snapshot(snapshot, prefix, strategy, end_date, tickers=tickers, **overrides).run()
+
+
+def run_forks(snapshot, prefix, variants: dict, end_date, max_workers=None):
+    """
+    {name: results} for {name: run_fork kwargs (strategy, tickers, costs...)}, continued in parallel from one snapshot.
+    """
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = {name: pool.submit(run_fork, snapshot, prefix, end_date=end_date, **variant) for name, variant in variants.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+
+def results_key(tickers, strat, start_date, end_date, slippage=0.001, commission=0.0005, vectorized=False):
+    # Runs ending after today depend on the day they were run, prices for the rest of the range don't exist yet
+    data_as_of = min(pd.Timestamp(end_date), pd.Timestamp.today().normalize())
+    return config_key(
+        "results", strat, [tickers] if isinstance(tickers, str) else list(tickers), as_date(start_date), as_date(end_date),
+        as_date(data_as_of), {"slippage": slippage, "commission": commission, "vectorized": vectorized}, code_version()
+    )
 
 
-def main(tickers, strat, benchmark_ticker, benchmark_strat, start_date, end_date, slippage=0.001, commission=0.0005):
-    # Run backtest
-    cost_model = TransactionCostModel()
-    strat_engine = BacktestEngine(tickers, strat, cost_model, start_date, end_date, slippage=slippage, commission=commission)
-    # strat_equity, strat_returns = strat_engine.run()
+def fund_key(fund_fingerprint, start_date, end_date, slippage=0.001, commission=0.0005):
+    # Keys a fund's stored runs by its config descriptors, so a lookup doesn't have to build any strategy
+    data_as_of = min(pd.Timestamp(end_date), pd.Timestamp.today().normalize())
+    return config_key(
+        "fund", fund_fingerprint, as_date(start_date), as_date(end_date), as_date(data_as_of),
+        {"slippage": slippage, "commission": commission}, code_version()
+    )
 
-    # Benchmark = SPY
-    bmk_engine = BacktestEngine([benchmark_ticker], benchmark_strat, cost_model, start_date, end_date, slippage=slippage, commission=commission)
-    # bmk_equity, bmk_returns = bmk_engine.run()
 
-    returns, equity_curve, trades_df, positions_df = strat_engine.run()
-    bmk_returns, bmk_equity, _, _ = bmk_engine.run()
+def lineage_key(tickers, strat, start_date, slippage=0.001, commission=0.0005):
+    # Event-loop runs that differ only in their end date, each is a prefix of the longer ones
+    return config_key(
+        "lineage", strat, [tickers] if isinstance(tickers, str) else list(tickers), as_date(start_date),
+        {"slippage": slippage, "commission": commission}, code_version(), ignore_end_dates=True
+    )
+
+
+def benchmark_key(benchmark_ticker, benchmark_strat, start_date, end_date, slippage=0.001, commission=0.0005, vectorized=False):
+    # Dated and versioned like results_key, so a benchmark is never older than the strategy runs it's compared with
+    data_as_of = min(pd.Timestamp(end_date), pd.Timestamp.today().normalize())
+    return config_key(
+        "benchmark", benchmark_strat, [benchmark_ticker], as_date(start_date), as_date(end_date),
+        as_date(data_as_of), {"slippage": slippage, "commission": commission, "vectorized": vectorized}, code_version()
+    )
+
+
+def run_benchmark(benchmark_ticker, benchmark_strat, start_date, end_date, slippage=0.001, commission=0.0005, vectorized=False):
+    """
+    Benchmark returns, simulated at most once per configuration and reused by every caller (and across restarts).
+    """
+    key = benchmark_key(benchmark_ticker, benchmark_strat, start_date, end_date, slippage, commission, vectorized)
+    return BenchmarkCache().get_or_run(key, lambda: run_engine(
+        [benchmark_ticker], benchmark_strat, start_date, end_date, slippage=slippage, commission=commission, vectorized=vectorized
+    )[0])
+
 
+def build_stats(returns, bmk_returns, trades_df, positions_df):
     # Reformat returns into a DataFrame
     returns_df = pd.DataFrame({
         "strategy": returns,
         "benchmark": bmk_returns
     }).dropna()
 
-    stats = PerformanceStats(
+    return PerformanceStats(
         returns_df=returns_df,
         trades=trades_df,
         positions=positions_df
     )
-    return stats
+
+
+def main(tickers, strat, benchmark_ticker, benchmark_strat, start_date, end_date, slippage=0.001, commission=0.0005, vectorized=False):
+    # Run backtest
+    returns, equity_curve, trades_df, positions_df = run_engine(
+        tickers, strat, start_date, end_date, slippage=slippage, commission=commission, vectorized=vectorized
+    )
+    # Benchmark = SPY
+    bmk_returns = run_benchmark(
+        benchmark_ticker, benchmark_strat, start_date, end_date, slippage=slippage, commission=commission, vectorized=vectorized
+    )
+    return build_stats(returns, bmk_returns, trades_df, positions_df)
 
 
 if __name__ == '__main__':
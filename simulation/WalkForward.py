@@ -0,0 +1,173 @@
+import numpy as np
+import pandas as pd
+from datasets.GetSeries import GetSeries
+from simulation.ParameterSweep import ParameterSweep
+from simulation.StrategyExecution import BacktestEngine, TransactionCostModel, run_benchmark, build_stats
+from strategies.InitialiseStrategy import InitialiseStrategy
+from strategies.signal_generation.BuyAndHoldStrategy import BuyAndHoldStrategy
+from strategies.signal_generation.MeanReversionStrategy import MeanReversionStrategy
+from strategies.signal_generation.WalkForwardStrategy import WalkForwardStrategy
+from strategies.allocations.EqualWeightAllocator import EqualWeightAllocator
+from strategies.allocations.VolatilityScaledAllocator import VolatilityScaledAllocator
+
+
+def _sharpe(returns: np.ndarray) -> np.ndarray:
+    std = returns.std(axis=0, ddof=1)
+    return np.where(std > 0, returns.mean(axis=0) / np.where(std > 0, std, 1) * np.sqrt(252), -np.inf)
+
+
+def _total_return(returns: np.ndarray) -> np.ndarray:
+    return np.prod(1 + returns, axis=0) - 1
+
+
+class WalkForwardOptimizer:
+    """
+    Re-fits strategy parameters on a trailing training window and applies them to the following test window,
+    rolling forward across the whole history. The out-of-sample windows are stitched into one strategy
+    (see WalkForwardStrategy) and backtested once, so the result includes the cost of switching parameters.
+
+    Each parameter setting is simulated once over the full history (in parallel, via ParameterSweep),
+    and every window's training score is read off a slice of those returns rather than re-simulated.
+    """
+    objectives = {"Sharpe Ratio": _sharpe, "Total Return": _total_return}
+
+    def __init__(
+        self,
+        strategy_cls,
+        allocator_cls,
+        tickers,
+        start,
+        end,
+        param_grid: dict,
+        train_window=252,
+        test_window=63,
+        objective="Sharpe Ratio",
+        allocator_kwargs=None,
+        benchmark_ticker="SPY",
+        slippage=0.001,
+        commission=0.0005,
+        max_workers=None
+    ):
+        if objective not in self.objectives:
+            raise ValueError(f"Unknown objective {objective}, expected one of {list(self.objectives)}")
+        self.strategy_cls = strategy_cls
+        self.allocator_cls = allocator_cls
+        self.tickers = tickers
+        self.start = start
+        self.end = end
+        self.param_grid = param_grid
+        self.train_window = train_window  # Bars
+        self.test_window = test_window  # Bars
+        self.objective = objective
+        self.allocator_kwargs = allocator_kwargs or {}
+        self.benchmark_ticker = benchmark_ticker
+        self.slippage = slippage
+        self.commission = commission
+        self.max_workers = max_workers
+
+    def windows(self, dates: pd.DatetimeIndex) -> list:
+        """
+        [(train_start, train_end, test_end)] as row positions, end exclusive.
+        """
+        return [
+            (test_start - self.train_window, test_start, min(test_start + self.test_window, len(dates)))
+            for test_start in range(self.train_window, len(dates), self.test_window)
+        ]
+
+    def select_parameters(self):
+        """
+        Returns the parameter schedule [(test start date, params)] and a table of the choice made in each window.
+        """
+        sweep = ParameterSweep(
+            strategy_cls=self.strategy_cls,
+            allocator_cls=self.allocator_cls,
+            tickers=self.tickers,
+            start=self.start,
+            end=self.end,
+            param_grid=self.param_grid,
+            allocator_kwargs=self.allocator_kwargs,
+            slippage=self.slippage,
+            commission=self.commission,
+            max_workers=self.max_workers
+        )
+        param_sets = sweep.param_sets()
+        returns = sweep.returns().fillna(0.0)
+        score = self.objectives[self.objective]
+
+        schedule, rows = [], []
+        for train_start, train_end, test_end in self.windows(returns.index):
+            scores = score(returns.iloc[train_start:train_end].to_numpy())
+            best = int(np.argmax(scores))
+            test_start_date = returns.index[train_end]
+            schedule.append((test_start_date, param_sets[best]))
+            rows.append({
+                "Train Start": returns.index[train_start],
+                "Test Start": test_start_date,
+                "Test End": returns.index[test_end - 1],
+                **param_sets[best],
+                f"Train {self.objective}": scores[best],
+            })
+        return schedule, pd.DataFrame(rows)
+
+    def run(self):
+        """
+        Returns (PerformanceStats of the stitched out-of-sample run, table of parameters chosen per window).
+        """
+        schedule, selections = self.select_parameters()
+        if not schedule:
+            raise ValueError("Not enough history for a single train/test window")
+
+        strategy = InitialiseStrategy(
+            strategy_cls=WalkForwardStrategy,
+            allocator_cls=self.allocator_cls,
+            tickers=self.tickers,
+            start=self.start,
+            end=self.end,
+            strategy_kwargs={"strategy_cls": self.strategy_cls, "schedule": schedule},
+            allocator_kwargs=self.allocator_kwargs
+        )
+        cost_model = TransactionCostModel(slippage=self.slippage, trading_fee=self.commission)
+        engine = BacktestEngine(
+            self.tickers, strategy, cost_model, self.start, self.end,
+            slippage=self.slippage, commission=self.commission, vectorized=True
+        )
+        returns, equity_curve, trades_df, positions_df = engine.run()
+
+        # Only the out-of-sample period counts, before the first test window the strategy sits in cash
+        oos_start = schedule[0][0]
+        benchmark = InitialiseStrategy(
+            strategy_cls=BuyAndHoldStrategy,
+            allocator_cls=EqualWeightAllocator,
+            tickers=self.benchmark_ticker,
+            start=self.start,
+            end=self.end
+        )
+        bmk_returns = run_benchmark(
+            self.benchmark_ticker, benchmark, self.start, self.end, slippage=self.slippage, commission=self.commission
+        )
+        stats = build_stats(
+            returns.loc[oos_start:],
+            bmk_returns.loc[oos_start:],
+            trades_df[trades_df["Date"] >= oos_start],
+            positions_df[positions_df["Date"] >= oos_start]
+        )
+        return stats, selections
+
+
+if __name__ == '__main__':
+    tickers = ["AAPL", "MSFT", "GOOG", "TSLA"]
+    start = "2018-01-01"
+    end = "2024-12-31"
+    vol_data = GetSeries(ticker=tickers, start=start, end=end).fetch_volatility()
+    optimizer = WalkForwardOptimizer(
+        strategy_cls=MeanReversionStrategy,
+        allocator_cls=VolatilityScaledAllocator,
+        tickers=tickers,
+        start=start,
+        end=end,
+        param_grid={"lookback": [10, 20, 40], "bound": [0.5, 1.0, 1.5, 2.0]},
+        allocator_kwargs={"vol_data": vol_data}
+    )
+    stats, selections = optimizer.run()
+    print(selections)
+    print(stats.to_dict())
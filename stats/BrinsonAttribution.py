@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+
+
+class BrinsonAttribution:
+    """
+    Brinson-Fachler allocation, selection and interaction effects for every period and group at once,
+    linked across periods with Carino smoothing so effects add up to the compounded active return.
+
+    portfolio_weights / benchmark_weights: Date x ticker weights held over each period (i.e. set at the
+    previous close), any weight not in a ticker is treated as cash earning 0. asset_returns: Date x ticker.
+    groups: {ticker: group label}, e.g. sector. Where the benchmark holds nothing in a group, the group's
+    benchmark return is taken to be the portfolio's, so the whole active return of that group is allocation.
+    """
+    effects = ["Allocation", "Selection", "Interaction"]
+
+    def __init__(self, portfolio_weights: pd.DataFrame, benchmark_weights: pd.DataFrame, asset_returns: pd.DataFrame, groups: dict):
+        tickers = list(asset_returns.columns)
+        self.dates = asset_returns.index
+        labels = pd.Series(groups).reindex(tickers).fillna("Unknown")
+        codes, self.groups = pd.factorize(labels)
+        self.groups = list(self.groups) + ["Cash"]
+
+        r = asset_returns.fillna(0.0).to_numpy()
+        w_p = self._align(portfolio_weights, tickers)
+        w_b = self._align(benchmark_weights, tickers)
+
+        # Ticker -> group one-hot, cash is its own group with a zero return
+        one_hot = np.zeros((len(tickers), len(self.groups)))
+        one_hot[np.arange(len(tickers)), codes] = 1.0
+        group_w_p = np.column_stack([w_p @ one_hot[:, :-1], 1 - w_p.sum(axis=1)])
+        group_w_b = np.column_stack([w_b @ one_hot[:, :-1], 1 - w_b.sum(axis=1)])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            group_r_p = np.where(group_w_p != 0, ((w_p * r) @ one_hot) / group_w_p, 0.0)
+            group_r_b = np.where(group_w_b != 0, ((w_b * r) @ one_hot) / group_w_b, group_r_p)
+
+        self.portfolio_return = pd.Series((group_w_p * group_r_p).sum(axis=1), index=self.dates)
+        self.benchmark_return = pd.Series((group_w_b * group_r_b).sum(axis=1), index=self.dates)
+
+        active_w = group_w_p - group_w_b
+        # (effect, date, group)
+        self._effects = np.stack([
+            active_w * (group_r_b - self.benchmark_return.to_numpy()[:, None]),
+            group_w_b * (group_r_p - group_r_b),
+            active_w * (group_r_p - group_r_b),
+        ])
+
+    def _align(self, weights, tickers):
+        return weights.reindex(columns=tickers).reindex(weights.index.union(self.dates)).ffill() \
+            .reindex(self.dates).fillna(0.0).to_numpy()
+
+    def period_effects(self, effect: str) -> pd.DataFrame:
+        """
+        Date x group single-period effect, unlinked.
+        """
+        return pd.DataFrame(self._effects[self.effects.index(effect)], index=self.dates, columns=self.groups)
+
+    def summary(self, start=None, end=None) -> pd.DataFrame:
+        """
+        Group x effect table linked over [start, end], with a Total column. Rows sum to the compounded
+        active return of the attributed weights (trading costs are not attributed).
+        """
+        rows = (self.dates >= pd.Timestamp(start or self.dates[0])) & (self.dates <= pd.Timestamp(end or self.dates[-1]))
+        r_p, r_b = self.portfolio_return.to_numpy()[rows], self.benchmark_return.to_numpy()[rows]
+
+        # Carino: scale each period by k_t / K so the log-smoothed effects compound exactly
+        k_t = self._carino(np.log1p(r_p) - np.log1p(r_b), r_p - r_b, r_b)
+        total_p, total_b = np.prod(1 + r_p) - 1, np.prod(1 + r_b) - 1
+        k = self._carino(np.log1p(total_p) - np.log1p(total_b), total_p - total_b, total_b)
+        linked = np.einsum("t,etg->ge", k_t / k, self._effects[:, rows])
+
+        table = pd.DataFrame(linked, index=self.groups, columns=self.effects)
+        table["Total"] = table.sum(axis=1)
+        return table.loc[(table != 0).any(axis=1)]
+
+    @staticmethod
+    def _carino(log_diff, diff, r_b):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # Equal returns, the limit of the ratio is 1 / (1 + r)
+            return np.where(np.abs(diff) > 1e-12, log_diff / np.where(np.abs(diff) > 1e-12, diff, 1), 1 / (1 + r_b))
+
+
+if __name__ == '__main__':
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range("2024-01-01", periods=250)
+    tickers = [f"T{i}" for i in range(2000)]
+    sectors = {t: f"Sector {i % 11}" for i, t in enumerate(tickers)}
+    returns = pd.DataFrame(rng.normal(0.0004, 0.02, (len(dates), len(tickers))), index=dates, columns=tickers)
+    portfolio = pd.DataFrame(rng.dirichlet(np.ones(len(tickers)), len(dates)) * 0.98, index=dates, columns=tickers)
+    benchmark = pd.DataFrame(1 / len(tickers), index=dates, columns=tickers)
+
+    attribution = BrinsonAttribution(portfolio, benchmark, returns, sectors)
+    summary = attribution.summary()
+    print(summary)
+    active = np.prod(1 + attribution.portfolio_return) - np.prod(1 + attribution.benchmark_return)
+    print("Sum of effects:", summary["Total"].sum(), "Active return:", active)
@@ -0,0 +1,194 @@
+import copy
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from datasets.GetSeries import GetSeries
+from utils.cache_keys import config_key, as_date
+
+
+class CovarianceRiskModel:
+    """
+    Point-in-time daily return covariance matrices for a universe, one per bar.
+    method: "sample" (trailing window), "ewma" (RiskMetrics, zero mean, bias corrected at start-up)
+    or "ledoit_wolf" (trailing window shrunk towards a scaled identity).
+
+    Estimates are updated bar to bar from running sums rather than re-estimated, so walking a backtest
+    forward costs O(N^2) per bar whatever the history length. The window sums are re-summed from the
+    window every `window` bars so round-off from adding and removing returns doesn't build up. Models
+    and computed matrices are cached (least recently used evicted) for the whole process, and the
+    estimator state is checkpointed so earlier dates can be revisited without replaying from the start.
+    """
+    methods = ("sample", "ewma", "ledoit_wolf")
+    max_cached_models = 8  # Each holds its returns and a checkpoint of the sums every checkpoint_every bars
+    max_cached_matrices = 256  # A 500 asset matrix is 2MB
+    checkpoint_every = 63
+
+    _models = OrderedDict()  # {model key: CovarianceRiskModel}, least recently used first
+    _matrices = OrderedDict()  # {(model key, bar): pd.DataFrame}, least recently used first
+    _lock = threading.RLock()
+
+    def __init__(self, tickers, start, end, method="ledoit_wolf", window=252, halflife=63):
+        if method not in self.methods:
+            raise ValueError(f"Unknown covariance method {method}, expected one of {self.methods}")
+        self.returns = GetSeries(ticker=tickers, start=start, end=end).fetch_returns()
+        self.tickers = list(self.returns.columns)
+        self.start, self.end = start, end
+        self.method = method
+        self.window = window  # Bars, sample and ledoit_wolf
+        self.halflife = halflife  # Bars, ewma
+        self.key = config_key("covariance", self.fingerprint())
+
+        self._values = self.returns.to_numpy()
+        self._t = -1  # Last bar folded into the state
+        self._state = self._empty_state()
+        self._checkpoints = {-1: copy.deepcopy(self._state)}
+
+    @classmethod
+    def shared(cls, tickers, start, end, method="ledoit_wolf", window=252, halflife=63):
+        """
+        One model per universe and estimator for the whole process, so allocators and pages share state.
+        """
+        tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+        key = config_key("covariance", sorted(tickers), as_date(start), as_date(end), method, window, halflife)
+        with cls._lock:
+            if key in cls._models:
+                cls._models.move_to_end(key)
+                return cls._models[key]
+            model = cls._models[key] = cls(tickers, start, end, method=method, window=window, halflife=halflife)
+            if len(cls._models) > cls.max_cached_models:
+                cls._models.popitem(last=False)
+            return model
+
+    def fingerprint(self) -> dict:
+        return {
+            "tickers": self.tickers,
+            "start": as_date(self.start),
+            "end": as_date(self.end),
+            "method": self.method,
+            "window": self.window,
+            "halflife": self.halflife,
+        }
+
+    def covariance(self, date) -> pd.DataFrame:
+        """
+        Covariance estimated from returns up to and including date. NaN before there are two observations.
+        """
+        t = self.returns.index.searchsorted(pd.Timestamp(date), side="right") - 1
+        with self._lock:
+            cached = self._matrices.get((self.key, t))
+            if cached is not None:
+                self._matrices.move_to_end((self.key, t))
+                return cached
+            self._advance_to(t)
+            matrix = pd.DataFrame(self._estimate(), index=self.tickers, columns=self.tickers)
+            self._matrices[(self.key, t)] = matrix
+            if len(self._matrices) > self.max_cached_matrices:
+                self._matrices.popitem(last=False)
+            return matrix
+
+    def _empty_state(self):
+        n_tickers = len(self.tickers)
+        if self.method == "ewma":
+            return {"cov": np.zeros((n_tickers, n_tickers)), "weight": 0.0}
+        return {
+            "n": 0,
+            "sum_y": np.zeros(n_tickers),
+            "sum_yy": np.zeros((n_tickers, n_tickers)),
+            "sum_sq": 0.0,  # sum of ||y||^2, for the Ledoit-Wolf shrinkage intensity
+            "sum_sq2": 0.0,  # sum of ||y||^4
+            "sum_sq_y": np.zeros(n_tickers),  # sum of ||y||^2 * y
+        }
+
+    def _advance_to(self, t):
+        if t < self._t:
+            # Going back in time, resume from the latest checkpoint at or before t
+            restart = max(c for c in self._checkpoints if c <= t)
+            self._state = copy.deepcopy(self._checkpoints[restart])
+            self._t = restart
+        while self._t < t:
+            self._t += 1
+            self._update(self._t)
+            if self._t % self.checkpoint_every == 0 and self._t not in self._checkpoints:
+                self._checkpoints[self._t] = copy.deepcopy(self._state)
+
+    def _update(self, t):
+        y = self._values[t]
+        state = self._state
+        if self.method == "ewma":
+            decay = 0.5 ** (1 / self.halflife)
+            state["cov"] *= decay
+            state["cov"] += (1 - decay) * np.outer(y, y)
+            state["weight"] = decay * state["weight"] + (1 - decay)
+            return
+        if t % self.window == 0:
+            self._resum(t)
+            return
+        self._accumulate(y, 1)
+        if state["n"] > self.window:
+            self._accumulate(self._values[t - self.window], -1)
+
+    def _resum(self, t):
+        # The window's sums computed afresh, dropping the round-off of the adds and removes before
+        y = self._values[max(t - self.window + 1, 0):t + 1]
+        sq = np.einsum("ij,ij->i", y, y)
+        self._state.update({
+            "n": len(y),
+            "sum_y": y.sum(axis=0),
+            "sum_yy": y.T @ y,
+            "sum_sq": sq.sum(),
+            "sum_sq2": sq @ sq,
+            "sum_sq_y": sq @ y,
+        })
+
+    def _accumulate(self, y, sign):
+        state = self._state
+        sq = y @ y
+        state["n"] += sign
+        state["sum_y"] += sign * y
+        state["sum_yy"] += sign * np.outer(y, y)
+        state["sum_sq"] += sign * sq
+        state["sum_sq2"] += sign * sq * sq
+        state["sum_sq_y"] += sign * sq * y
+
+    def _estimate(self):
+        state = self._state
+        n_tickers = len(self.tickers)
+        if self.method == "ewma":
+            if state["weight"] == 0:
+                return np.full((n_tickers, n_tickers), np.nan)
+            return state["cov"] / state["weight"]
+
+        n = state["n"]
+        if n < 2:
+            return np.full((n_tickers, n_tickers), np.nan)
+        mean = state["sum_y"] / n
+        scatter = state["sum_yy"] - n * np.outer(mean, mean)  # Sum of demeaned outer products
+        if self.method == "sample":
+            return scatter / (n - 1)
+
+        # Ledoit-Wolf (2004) towards mu * I, on the biased covariance S = scatter / n
+        s = scatter / n
+        mu = np.trace(s) / n_tickers
+        s_norm2 = np.sum(s * s)
+        delta2 = s_norm2 - n_tickers * mu ** 2
+        # sum_k ||x_k||^4 for the demeaned x_k = y_k - mean, expanded into the running sums
+        m2 = mean @ mean
+        sum_x4 = (
+            state["sum_sq2"]
+            + 4 * mean @ state["sum_yy"] @ mean
+            - 4 * mean @ state["sum_sq_y"]
+            + 2 * m2 * state["sum_sq"]
+            - 3 * n * m2 ** 2
+        )
+        beta2 = max(sum_x4 / n - s_norm2, 0) / n
+        shrinkage = min(beta2, delta2) / delta2 if delta2 > 0 else 1.0
+        return shrinkage * mu * np.eye(n_tickers) + (1 - shrinkage) * s
+
+
+if __name__ == '__main__':
+    tickers = ["AAPL", "MSFT", "GOOG", "TSLA"]
+    for method in CovarianceRiskModel.methods:
+        model = CovarianceRiskModel.shared(tickers, "2020-01-01", "2024-12-31", method=method)
+        print(method)
+        print(model.covariance("2023-06-30") * 252)
@@ -0,0 +1,123 @@
+import threading
+import numpy as np
+import pandas as pd
+from datasets.GetSeries import GetSeries
+from datasets.SecurityMetadata import SecurityMetadata
+from utils.cache_keys import config_key, as_date
+
+
+class FactorRiskModel:
+    """
+    Cross-sectional factor model r_t = X_t f_t + u_t estimated for every date in one batched regression.
+    Factors: Market (intercept), Style (momentum, volatility, size z-scores), Industry (sector) and
+    Currency, the last two as cross-sectionally demeaned dummies. Exposures on date t only use prices
+    up to t - 1. Factor covariance and specific variance are exponentially weighted over the factor
+    returns and residuals.
+    A small ridge penalty on every factor but Market keeps the regressions well posed when a fund's
+    universe has fewer assets than factors, poorly identified factor returns shrink into the residual.
+    """
+    categories = ["Market", "Style", "Industry", "Currency"]
+
+    _shared = {}  # {model key: FactorRiskModel}
+    _lock = threading.Lock()
+
+    def __init__(self, tickers, start, end, halflife=63, ridge=0.1, classifications: pd.DataFrame = None):
+        self.tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+        self.start, self.end = start, end
+        self.halflife = halflife
+        self.ridge = ridge
+
+        prices = GetSeries(ticker=self.tickers, start=start, end=end).fetch_prices()
+        self.tickers = list(prices.columns)
+        returns = prices.pct_change().iloc[1:]
+        self.dates = returns.index
+        classifications = classifications if classifications is not None else SecurityMetadata.shared().get(self.tickers)
+        self.classifications = classifications.reindex(self.tickers).fillna({"sector": "Unknown", "currency": "Unknown"})
+
+        self.exposures = self._exposures(prices, returns)  # (T, N, K)
+        r = returns.to_numpy()
+        # Batched ridge regression, one K x K system per date
+        n_factors = len(self.factor_names)
+        penalty = self.ridge * np.diag([0.0] + [1.0] * (n_factors - 1))
+        gram = np.einsum("tnk,tnl->tkl", self.exposures, self.exposures) + penalty
+        factor_returns = np.linalg.solve(gram, np.einsum("tnk,tn->tk", self.exposures, r)[..., None])[..., 0]
+        residuals = r - np.einsum("tnk,tk->tn", self.exposures, factor_returns)
+        self.factor_returns = pd.DataFrame(factor_returns, index=self.dates, columns=self.factor_names)
+        self.residuals = pd.DataFrame(residuals, index=self.dates, columns=self.tickers)
+
+        outer = np.einsum("tk,tl->tkl", factor_returns, factor_returns).reshape(len(self.dates), -1)
+        self.factor_cov = pd.DataFrame(outer).ewm(halflife=halflife).mean().to_numpy().reshape(-1, n_factors, n_factors)
+        self.specific_var = (self.residuals ** 2).ewm(halflife=halflife).mean()
+
+    @classmethod
+    def shared(cls, tickers, start, end, halflife=63, ridge=0.1):
+        tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+        key = config_key("factor_model", sorted(tickers), as_date(start), as_date(end), halflife, ridge)
+        with cls._lock:
+            if key not in cls._shared:
+                cls._shared[key] = cls(tickers, start, end, halflife=halflife, ridge=ridge)
+            return cls._shared[key]
+
+    def _exposures(self, prices, returns):
+        def zscore(frame):
+            # Cross-sectional, tickers without history yet sit at the average (0)
+            std = frame.std(axis=1).replace(0, np.nan)
+            return frame.sub(frame.mean(axis=1), axis=0).div(std, axis=0).fillna(0.0)
+
+        lagged = prices.shift(1).loc[self.dates]
+        styles = {
+            "Momentum": zscore(lagged.shift(21) / lagged.shift(252) - 1),
+            "Volatility": zscore(returns.shift(1).rolling(63, min_periods=20).std()),
+            "Size": zscore(pd.DataFrame(
+                np.tile(np.log(self.classifications["marketCap"].astype(float).to_numpy()), (len(self.dates), 1)),
+                index=self.dates, columns=self.tickers
+            )),
+        }
+
+        def dummies(column):
+            one_hot = pd.get_dummies(self.classifications[column]).astype(float)
+            return one_hot - one_hot.mean()  # Demeaned so they don't overlap the market intercept
+
+        industries, currencies = dummies("sector"), dummies("currency")
+        self.factor_names = ["Market", *styles, *industries.columns, *currencies.columns]
+        self.factor_categories = ["Market"] + ["Style"] * len(styles) + \
+            ["Industry"] * industries.shape[1] + ["Currency"] * currencies.shape[1]
+
+        n_dates, n_tickers = len(self.dates), len(self.tickers)
+        static = np.hstack([industries.to_numpy(), currencies.to_numpy()])
+        return np.concatenate([
+            np.ones((n_dates, n_tickers, 1)),
+            np.stack([style.to_numpy() for style in styles.values()], axis=-1),
+            np.broadcast_to(static, (n_dates, *static.shape)),
+        ], axis=-1)
+
+    def decompose(self, weights: pd.DataFrame) -> pd.DataFrame:
+        """
+        Annualised volatility contribution by factor category plus Idiosyncratic for a Date x ticker weight
+        panel (portfolio, benchmark or active weights). Contributions are Euler allocations, so each row sums
+        to the portfolio's predicted volatility.
+        """
+        unknown = set(weights.columns) - set(self.tickers) - {"CASH"}
+        if unknown:
+            raise ValueError(f"Weights for tickers outside the model universe: {sorted(unknown)}")
+        w = weights.reindex(columns=self.tickers).reindex(weights.index.union(self.dates)).ffill() \
+            .reindex(self.dates).fillna(0.0).to_numpy()
+
+        x = np.einsum("tnk,tn->tk", self.exposures, w)  # Portfolio factor exposures
+        factor_var = x * np.einsum("tkl,tl->tk", self.factor_cov, x)
+        categories = pd.get_dummies(pd.Series(self.factor_categories)).reindex(columns=self.categories).to_numpy(dtype=float)
+        contributions = np.column_stack([factor_var @ categories, (w ** 2 * self.specific_var.to_numpy()).sum(axis=1)])
+
+        total_var = contributions.sum(axis=1, keepdims=True)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            vol_contributions = np.where(total_var > 0, 252 * contributions / np.sqrt(252 * total_var), 0.0)
+        return pd.DataFrame(vol_contributions, index=self.dates, columns=self.categories + ["Idiosyncratic"])
+
+
+if __name__ == '__main__':
+    tickers = ["AAPL", "MSFT", "GOOG", "TSLA", "XOM", "JPM", "BHP.AX", "CBA.AX", "SPY"]
+    model = FactorRiskModel.shared(tickers, "2020-01-01", "2024-12-31")
+    equal_weight = pd.DataFrame(1 / len(tickers), index=model.dates, columns=model.tickers)
+    risk = model.decompose(equal_weight)
+    print(risk.tail())
+    print("Predicted vol:", risk.iloc[-1].sum())
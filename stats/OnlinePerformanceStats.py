@@ -0,0 +1,181 @@
+import numpy as np
+import pandas as pd
+
+
+class _RollingWindow:
+    """
+    Fixed-length ring buffer with a windowed Welford mean and sum of squared deviations.
+    """
+    def __init__(self, size: int):
+        self.size = size
+        self.buffer = np.zeros(size)
+        self.count = 0  # Values seen, the window is full once count >= size
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def push(self, x: float):
+        slot = self.count % self.size
+        if self.count < self.size:
+            n = self.count + 1
+            delta = x - self.mean
+            self.mean += delta / n
+            self.m2 += delta * (x - self.mean)
+        else:
+            old = self.buffer[slot]
+            old_mean = self.mean
+            self.mean += (x - old) / self.size
+            self.m2 += (x - old) * (x - self.mean + old - old_mean)
+        self.buffer[slot] = x
+        self.count += 1
+
+    @property
+    def full(self) -> bool:
+        return self.count >= self.size
+
+    @property
+    def std(self) -> float:
+        return np.sqrt(max(self.m2, 0.0) / (self.size - 1)) if self.full else np.nan
+
+
+class OnlinePerformanceStats:
+    """
+    Incremental counterpart of PerformanceStats' return metrics for daily-refresh runs, each update() is O(1).
+    Values match the batch class to floating point tolerance. Trade and holding statistics are not covered.
+    """
+    windows = {"3M": 63, "6M": 126, "12M": 252}
+
+    def __init__(self):
+        self.n = 0
+        self.growth = 1.0  # prod(1 + r)
+        self.excess_growth = 1.0  # prod(1 + (r - b))
+        self.peak = -np.inf
+        self.max_drawdown = np.nan
+
+        # Running means and co-moments (Welford)
+        self.mean_r = self.mean_b = self.mean_ex = 0.0
+        self.m2_r = self.m2_b = self.m2_ex = 0.0
+        self.c_rb = 0.0
+
+        # Up/down capture
+        self.up_sum_r = self.up_sum_b = 0.0
+        self.up_count = 0
+        self.down_sum_r = self.down_sum_b = 0.0
+        self.down_count = 0
+
+        self.rolling_r = {label: _RollingWindow(win) for label, win in self.windows.items()}
+        self.rolling_ex = {label: _RollingWindow(win) for label, win in self.windows.items()}
+
+    def update(self, strategy_ret: float, benchmark_ret: float):
+        r, b = float(strategy_ret), float(benchmark_ret)
+        ex = r - b
+        self.n += 1
+
+        delta_r, delta_b, delta_ex = r - self.mean_r, b - self.mean_b, ex - self.mean_ex
+        self.mean_r += delta_r / self.n
+        self.mean_b += delta_b / self.n
+        self.mean_ex += delta_ex / self.n
+        self.m2_r += delta_r * (r - self.mean_r)
+        self.m2_b += delta_b * (b - self.mean_b)
+        self.m2_ex += delta_ex * (ex - self.mean_ex)
+        self.c_rb += delta_r * (b - self.mean_b)
+
+        self.growth *= 1 + r
+        self.excess_growth *= 1 + ex
+        self.peak = max(self.peak, self.growth)
+        drawdown = self.growth / self.peak - 1
+        self.max_drawdown = drawdown if np.isnan(self.max_drawdown) else min(self.max_drawdown, drawdown)
+
+        if b > 0:
+            self.up_sum_r += r
+            self.up_sum_b += b
+            self.up_count += 1
+        elif b < 0:
+            self.down_sum_r += r
+            self.down_sum_b += b
+            self.down_count += 1
+
+        for label in self.windows:
+            self.rolling_r[label].push(r)
+            self.rolling_ex[label].push(ex)
+
+    def extend(self, strategy_returns: pd.Series, benchmark_returns: pd.Series):
+        for r, b in zip(strategy_returns, benchmark_returns):
+            self.update(r, b)
+
+    def _var(self, m2):
+        return m2 / (self.n - 1) if self.n > 1 else np.nan
+
+    @property
+    def volatility(self):
+        return np.sqrt(self._var(self.m2_r)) * np.sqrt(252)
+
+    @property
+    def tracking_error(self):
+        return np.sqrt(self._var(self.m2_ex)) * np.sqrt(252)
+
+    @property
+    def sharpe(self):
+        std = np.sqrt(self._var(self.m2_r))
+        return self.mean_r / std * np.sqrt(252) if std > 0 else np.nan
+
+    @property
+    def info_ratio(self):
+        std = np.sqrt(self._var(self.m2_ex))
+        return self.mean_ex / std if std > 0 else np.nan
+
+    @property
+    def beta(self):
+        b_var = self._var(self.m2_b)
+        return self._var(self.c_rb) / b_var if b_var > 0 else np.nan
+
+    @property
+    def rolling_metrics(self) -> dict:
+        """
+        Latest value of each rolling window, NaN until the window has filled.
+        """
+        return {
+            label: {
+                "Sharpe Ratio": self.rolling_r[label].mean / self.rolling_r[label].std,
+                "Information Ratio": self.rolling_ex[label].mean / self.rolling_ex[label].std,
+                "Volatility": self.rolling_r[label].std * np.sqrt(252),
+            }
+            for label in self.windows
+        }
+
+    def to_dict(self):
+        return {
+            "Total Return": self.growth - 1,
+            "Excess Return": self.excess_growth - 1,
+            "Annualized Return": (1 + self.mean_r) ** 252 - 1,
+            "Volatility": self.volatility,
+            "Tracking Error": self.tracking_error,
+            "Sharpe Ratio": self.sharpe,
+            "Information Ratio": self.info_ratio,
+            "Beta": self.beta,
+            "Max Drawdown": self.max_drawdown,
+            "Up Capture": self.up_sum_r / self.up_sum_b if self.up_count else np.nan,
+            "Down Capture": self.down_sum_r / self.down_sum_b if self.down_count else np.nan,
+        }
+
+
+if __name__ == '__main__':
+    from stats.PerformanceStats import PerformanceStats
+
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range("2020-01-01", periods=1000)
+    bmk = pd.Series(rng.normal(0.0004, 0.01, len(dates)), index=dates)
+    strat = 0.8 * bmk + rng.normal(0.0002, 0.006, len(dates))
+
+    online = OnlinePerformanceStats()
+    online.extend(strat, bmk)
+    batch = PerformanceStats(
+        pd.DataFrame({"strategy": strat, "benchmark": bmk}),
+        trades=pd.DataFrame(columns=["Side", "Quantity", "Execution Price", "Signal Price"]),
+        positions=pd.DataFrame(columns=["Date", "Ticker", "Market Value", "Weight"])
+    )
+    batch_metrics = batch.to_dict()
+    for name, value in online.to_dict().items():
+        print(f"{name:<20} online {value: .10f}  batch {batch_metrics[name]: .10f}")
+    for label, metrics in online.rolling_metrics.items():
+        for name, value in metrics.items():
+            print(f"{label} {name:<20} online {value: .10f}  batch {batch.rolling_metrics[label][name].iloc[-1]: .10f}")
@@ -1,5 +1,7 @@
 import numpy as np
 import pandas as pd
+from stats.PositionEpisodes import PositionEpisodes
+from stats.RollingMoments import RollingMoments
 
 class PerformanceStats:
     def __init__(self, returns_df: pd.DataFrame, trades: pd.DataFrame, positions: pd.DataFrame):
@@ -38,52 +40,16 @@ class PerformanceStats:
 
     def _calculate_rolling(self):
         windows = {"3M": 63, "6M": 126, "12M": 252}
-        self.rolling_metrics = {}
-
-        for label, win in windows.items():
-            sharpe = self.strategy_returns.rolling(win).mean() / self.strategy_returns.rolling(win).std()
-            ir = (self.strategy_returns - self.benchmark_returns).rolling(win).mean() / \
-                 (self.strategy_returns - self.benchmark_returns).rolling(win).std()
-            vol = self.strategy_returns.rolling(win).std() * np.sqrt(252)
-
-            self.rolling_metrics[label] = {
-                "Sharpe Ratio": sharpe,
-                "Information Ratio": ir,
-                "Volatility": vol
-            }
+        self.rolling_metrics = RollingMoments(self.strategy_returns, self.benchmark_returns).windows(windows)
 
     def _calculate_trade_summary(self):
         trades = self.trades.copy()
         positions = self.positions.copy()
 
-        # --- Holding period (from positions) ---
-        holding_periods = []
-        positions.sort_values(["Ticker", "Date"], inplace=True)
-
-        for ticker, group in positions.groupby("Ticker"):
-            group = group.reset_index(drop=True)
-            in_position = False
-            start_date = None
-
-            for i in range(len(group)):
-                weight = group.loc[i, "Weight"]
-                date = group.loc[i, "Date"]
-
-                if not in_position and abs(weight) > 1e-4:
-                    in_position = True
-                    start_date = date
-                elif in_position and abs(weight) <= 1e-4:
-                    end_date = date
-                    holding_periods.append((ticker, (end_date - start_date).days))
-                    in_position = False
-
-            # Still in position at end of sample
-            if in_position:
-                end_date = group["Date"].iloc[-1]
-                holding_periods.append((ticker, (end_date - start_date).days))
-
-        holding_df = pd.DataFrame(holding_periods, columns=["Ticker", "HoldingPeriod"])
-        self.holding_period_avg = holding_df["HoldingPeriod"].mean() if not holding_df.empty else np.nan
+        # --- Holding period (from position episodes) ---
+        self.episodes = PositionEpisodes(positions, trades)
+        durations = self.episodes.table["Duration"]
+        self.holding_period_avg = durations.mean() if not durations.empty else np.nan
 
         # --- Turnover (from trades) ---
         trades["Notional"] = trades["Quantity"] * trades["Execution Price"]
@@ -91,17 +57,75 @@ class PerformanceStats:
         avg_mv = positions.groupby("Date")["Market Value"].sum().mean()
         self.turnover = total_notional / avg_mv if avg_mv and avg_mv != 0 else np.nan
 
-        # --- Win rate, avg/median pnl ---
-        # Approximate PnL: positive for sells where execution price > signal price
-        trades["SignedPnL"] = np.where(
-            trades["Side"] == "BUY",
-            -1 * (trades["Execution Price"] - trades["Signal Price"]) * trades["Quantity"],
-            (trades["Execution Price"] - trades["Signal Price"]) * trades["Quantity"]
-        )
-
-        self.win_rate = (trades["SignedPnL"] > 0).mean() if not trades.empty else np.nan
-        self.avg_pnl = trades["SignedPnL"].mean() if not trades.empty else np.nan
-        self.median_pnl = trades["SignedPnL"].median() if not trades.empty else np.nan
+        # --- Win rate, avg/median pnl (per round trip) ---
+        pnl = self.episodes.table["PnL"]
+        self.win_rate = (pnl > 0).mean() if not pnl.empty else np.nan
+        self.avg_pnl = pnl.mean() if not pnl.empty else np.nan
+        self.median_pnl = pnl.median() if not pnl.empty else np.nan
+
+    def resample_paths(self, method="block", n_paths=2000, block_size=20, seed=None):
+        """
+        Resampled (strategy, benchmark) return paths as two (n_paths, T) arrays, days kept paired.
+        method: "block" for a stationary block bootstrap (mean block length block_size),
+        "monte_carlo" for draws from a bivariate normal fitted to the observed returns.
+        """
+        rng = np.random.default_rng(seed)
+        observed = np.column_stack([self.strategy_returns.to_numpy(), self.benchmark_returns.to_numpy()])
+        T = len(observed)
+
+        if method == "monte_carlo":
+            draws = rng.multivariate_normal(observed.mean(axis=0), np.cov(observed, rowvar=False), size=(n_paths, T))
+            return draws[..., 0], draws[..., 1]
+        if method != "block":
+            raise ValueError(f"Unknown resampling method {method}, expected 'block' or 'monte_carlo'")
+
+        # A new block starts with probability 1 / block_size, otherwise the path carries on from the previous day
+        new_block = rng.random((n_paths, T)) < 1 / block_size
+        new_block[:, 0] = True
+        block_starts = rng.integers(0, T, size=(n_paths, T))
+        steps = np.arange(T)
+        last_start = np.maximum.accumulate(np.where(new_block, steps, 0), axis=1)
+        idx = (np.take_along_axis(block_starts, last_start, axis=1) + steps - last_start) % T
+        return observed[idx, 0], observed[idx, 1]
+
+    @staticmethod
+    def path_metrics(r: np.ndarray, b: np.ndarray) -> dict:
+        """
+        Headline metrics for every path at once, same definitions as _calculate_performance. Paths along axis 0.
+        """
+        excess = r - b
+        r_std, ex_std = r.std(axis=1, ddof=1), excess.std(axis=1, ddof=1)
+        b_var = b.var(axis=1, ddof=1)
+        cov = ((r - r.mean(axis=1, keepdims=True)) * (b - b.mean(axis=1, keepdims=True))).sum(axis=1) / (r.shape[1] - 1)
+        cum = np.cumprod(1 + r, axis=1)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return {
+                "Total Return": cum[:, -1] - 1,
+                "Volatility": r_std * np.sqrt(252),
+                "Sharpe Ratio": np.where(r_std > 0, r.mean(axis=1) / r_std * np.sqrt(252), np.nan),
+                "Information Ratio": np.where(ex_std > 0, excess.mean(axis=1) / ex_std, np.nan),
+                "Beta": np.where(b_var > 0, cov / b_var, np.nan),
+                "Max Drawdown": (cum / np.maximum.accumulate(cum, axis=1) - 1).min(axis=1),
+            }
+
+    def confidence_intervals(self, method="block", n_paths=2000, confidence=0.95, block_size=20, seed=None) -> pd.DataFrame:
+        """
+        Percentile confidence intervals from resampled paths, one row per metric next to its to_dict() estimate.
+        """
+        metrics = self.path_metrics(*self.resample_paths(method, n_paths, block_size, seed))
+        estimates = self.to_dict()
+        tail = (1 - confidence) / 2 * 100
+        return pd.DataFrame(
+            {
+                name: {
+                    "Estimate": estimates[name],
+                    "Lower": np.nanpercentile(values, tail),
+                    "Upper": np.nanpercentile(values, 100 - tail),
+                }
+                for name, values in metrics.items()
+            }
+        ).T
 
     def to_dict(self):
         return {
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+
+
+class PositionEpisodes:
+    """
+    Run-length encoded holding episodes, one row per continuous period a ticker is held.
+    Built once per run from the Date x Ticker position matrix, CASH is excluded.
+
+    table columns: Ticker, Entry Date, Exit Date, Duration (calendar days), Entry Value, Exit Value, PnL, Open.
+    Exit Date is the bar the position was closed on, or the last date for positions still open.
+    With trades, PnL nets every buy and sell in the episode against the value still held,
+    otherwise it falls back to Exit Value - Entry Value.
+    """
+    def __init__(self, positions: pd.DataFrame, trades: pd.DataFrame = None, threshold=1e-4):
+        positions = positions[positions["Ticker"] != "CASH"]
+        self.weights = positions.pivot_table(index="Date", columns="Ticker", values="Weight", aggfunc="sum").fillna(0.0)
+        self.market_values = positions.pivot_table(index="Date", columns="Ticker", values="Market Value", aggfunc="sum") \
+            .reindex_like(self.weights).fillna(0.0)
+        # An empty positions frame pivots to an object index, the date arithmetic below needs datetimes
+        self.weights.index = self.market_values.index = pd.DatetimeIndex(self.weights.index, name="Date")
+        self.held = self.weights.abs().to_numpy() > threshold
+        self._cum_flows = self._cumulative_flows(trades)
+        self.table = self._build()
+
+    def _cumulative_flows(self, trades):
+        """
+        (n_dates + 1) x ticker cumulative net cash flow from trades (sells positive), row i is the total before
+        bar i. None without trades.
+        """
+        if trades is None or trades.empty:
+            return None
+        flows = trades.assign(Flow=np.where(trades["Side"] == "SELL", 1, -1) * trades["Quantity"] * trades["Execution Price"]) \
+            .pivot_table(index="Date", columns="Ticker", values="Flow", aggfunc="sum") \
+            .reindex(index=self.weights.index, columns=self.weights.columns).fillna(0.0).to_numpy()
+        return np.vstack([np.zeros(len(self.weights.columns)), np.cumsum(flows, axis=0)])
+
+    def _build(self) -> pd.DataFrame:
+        dates, tickers = self.weights.index, self.weights.columns
+        n_dates = len(dates)
+
+        # +1 where a run of held bars starts, -1 on the first bar after it ends (n_dates if still open)
+        edges = np.diff(np.pad(self.held.astype(np.int8), ((1, 1), (0, 0))), axis=0)
+        start_cols, start_rows = np.nonzero(edges.T == 1)  # Transposed so runs come out grouped by ticker, in date order
+        _, end_rows = np.nonzero(edges.T == -1)
+        is_open = end_rows == n_dates
+        last_held = end_rows - 1
+        exit_rows = np.where(is_open, n_dates - 1, end_rows)
+
+        mv = self.market_values.to_numpy()
+        entry_value = mv[start_rows, start_cols]
+        exit_value = mv[last_held, start_cols]
+
+        if self._cum_flows is not None:
+            # An episode's PnL is the change in cumulative net cash flow over its bars, plus what is still held
+            cum_flows = self._cum_flows
+            pnl = cum_flows[exit_rows + 1, start_cols] - cum_flows[start_rows, start_cols] + np.where(is_open, exit_value, 0.0)
+        else:
+            pnl = exit_value - entry_value
+
+        entry_dates, exit_dates = dates[start_rows], dates[exit_rows]
+        return pd.DataFrame({
+            "Ticker": tickers[start_cols],
+            "Entry Date": entry_dates,
+            "Exit Date": exit_dates,
+            "Duration": (exit_dates - entry_dates).days,
+            "Entry Value": entry_value,
+            "Exit Value": exit_value,
+            "PnL": pnl,
+            "Open": is_open,
+        })
+
+    def open_at(self, date) -> pd.DataFrame:
+        """
+        Ticker-indexed episodes held on date, with Value and PnL measured up to date rather than to the episode's exit.
+        """
+        row = self.weights.index.get_loc(pd.Timestamp(date))
+        cols = np.flatnonzero(self.held[row])
+        # Each held ticker's episode is the one that started last on or before date
+        starts = np.vstack([self.held[:1], self.held[1:] & ~self.held[:-1]])[:row + 1, cols]
+        start_rows = row - np.argmax(starts[::-1], axis=0)
+
+        mv = self.market_values.to_numpy()
+        entry_value, value = mv[start_rows, cols], mv[row, cols]
+        if self._cum_flows is not None:
+            pnl = self._cum_flows[row + 1, cols] - self._cum_flows[start_rows, cols] + value
+        else:
+            pnl = value - entry_value
+        return pd.DataFrame({
+            "Entry Date": self.weights.index[start_rows],
+            "Entry Value": entry_value,
+            "Value": value,
+            "PnL": pnl,
+        }, index=self.weights.columns[cols])
+
+    def holding_age(self) -> pd.DataFrame:
+        """
+        Date x Ticker calendar days since the current episode was entered, NaN when not held.
+        """
+        dates = self.weights.index
+        entry_marker = np.vstack([np.ones((1, self.held.shape[1]), dtype=bool), self.held[1:] & ~self.held[:-1]]) & self.held
+        entry_row = np.maximum.accumulate(np.where(entry_marker, np.arange(len(dates))[:, None], 0), axis=0)
+        day_numbers = dates.values.astype("datetime64[D]").astype(np.int64)
+        age = (day_numbers[:, None] - day_numbers[entry_row]).astype(float)
+        return pd.DataFrame(np.where(self.held, age, np.nan), index=dates, columns=self.weights.columns)
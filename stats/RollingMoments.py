@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+
+class RollingMoments:
+    """
+    Rolling strategy/benchmark statistics for any set of windows from one set of prefix sums.
+    Sums of r, b, r^2, b^2 and r*b are accumulated once; every window's means, variances and covariance
+    (and so the excess-return moments) are differences of those sums. Returns are demeaned over the full
+    sample first, which leaves variances unchanged but keeps the sums of squares well conditioned.
+    """
+    def __init__(self, strategy_returns: pd.Series, benchmark_returns: pd.Series):
+        self.index = strategy_returns.index
+        r = strategy_returns.to_numpy(dtype=float)
+        b = benchmark_returns.to_numpy(dtype=float)
+        self.mean_r, self.mean_b = r.mean(), b.mean()
+        r, b = r - self.mean_r, b - self.mean_b
+
+        # Row k holds the sum over the first k observations
+        self.prefix = np.vstack([np.zeros(5), np.cumsum(np.column_stack([r, b, r * r, b * b, r * b]), axis=0)])
+
+    def window(self, win: int) -> pd.DataFrame:
+        """
+        Sharpe Ratio, Information Ratio, Volatility, Beta and Tracking Error over a trailing window of win bars,
+        same definitions as PerformanceStats. The first win - 1 rows are NaN.
+        """
+        out = np.full((len(self.index), 5), np.nan)
+        if win < 2 or win > len(self.index):
+            return self._frame(out)
+
+        s_r, s_b, s_rr, s_bb, s_rb = (self.prefix[win:] - self.prefix[:-win]).T
+        mean_r, mean_b = s_r / win, s_b / win
+        var_r = np.maximum(s_rr - win * mean_r ** 2, 0) / (win - 1)
+        var_b = np.maximum(s_bb - win * mean_b ** 2, 0) / (win - 1)
+        cov_rb = (s_rb - win * mean_r * mean_b) / (win - 1)
+        var_ex = np.maximum(var_r + var_b - 2 * cov_rb, 0)
+        std_r, std_ex = np.sqrt(var_r), np.sqrt(var_ex)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out[win - 1:] = np.column_stack([
+                (mean_r + self.mean_r) / std_r,
+                (mean_r - mean_b + self.mean_r - self.mean_b) / std_ex,
+                std_r * np.sqrt(252),
+                cov_rb / var_b,
+                std_ex * np.sqrt(252),
+            ])
+        return self._frame(out)
+
+    def windows(self, windows: dict) -> dict:
+        """
+        {label: {metric: pd.Series}} for windows given as {label: bars}.
+        """
+        return {label: {metric: series for metric, series in self.window(win).items()} for label, win in windows.items()}
+
+    def _frame(self, values):
+        columns = ["Sharpe Ratio", "Information Ratio", "Volatility", "Beta", "Tracking Error"]
+        return pd.DataFrame(np.where(np.isfinite(values), values, np.nan), index=self.index, columns=columns)
@@ -0,0 +1,135 @@
+import os
+import importlib
+import threading
+import functools
+import yaml
+from strategies.InitialiseStrategy import InitialiseStrategy
+from strategies.StrategyEnsemble import StrategyEnsemble
+from datasets.VolatilityPanel import VolatilityPanel
+
+CONFIG_PATH = os.environ.get("QAM_CONFIG", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config.yaml"))
+
+# Allocator kwargs given as {source: name, ...} in the config, called with (tickers, start, end, **rest)
+DATA_SOURCES = {
+    "volatility_panel": VolatilityPanel.shared,
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _load_funds(path, mtime):
+    # Keyed on mtime so edits to the config are picked up without a restart
+    with open(path) as f:
+        return (yaml.safe_load(f) or {}).get("funds", {})
+
+
+def _resolve_class(package, name):
+    # Classes live in modules of the same name, e.g. strategies.signal_generation.MomentumStrategy
+    return getattr(importlib.import_module(f"{package}.{name}"), name)
+
+
+class StrategyDescriptor:
+    """
+    A strategy as configured: class names, tickers, kwargs and capital weight.
+    Nothing is imported or downloaded until build() is called.
+    """
+    def __init__(self, name, spec: dict):
+        self.name = name
+        self.strategy_name = spec["class"]
+        self.allocator_name = spec["allocator"]
+        self.tickers = list(spec["tickers"])
+        self.weight = float(spec["weight"])
+        self.strategy_kwargs = dict(spec.get("strategy_kwargs") or {})
+        self.allocator_kwargs = dict(spec.get("allocator_kwargs") or {})
+
+    def fingerprint(self) -> dict:
+        # Straight from the config, so computing it never loads data
+        return {
+            "name": self.name,
+            "strategy": self.strategy_name,
+            "allocator": self.allocator_name,
+            "tickers": self.tickers,
+            "weight": self.weight,
+            "strategy_kwargs": self.strategy_kwargs,
+            "allocator_kwargs": self.allocator_kwargs,
+        }
+
+    def build(self, start, end):
+        """
+        (InitialiseStrategy, capital weight), the pair StrategyEnsemble expects.
+        """
+        allocator_kwargs = {
+            key: self._load_source(value, start, end) if isinstance(value, dict) and "source" in value else value
+            for key, value in self.allocator_kwargs.items()
+        }
+        strat = InitialiseStrategy(
+            strategy_cls=_resolve_class("strategies.signal_generation", self.strategy_name),
+            allocator_cls=_resolve_class("strategies.allocations", self.allocator_name),
+            tickers=self.tickers,
+            start=start,
+            end=end,
+            strategy_kwargs=self.strategy_kwargs,
+            allocator_kwargs=allocator_kwargs
+        )
+        return strat, self.weight
+
+    def _load_source(self, spec, start, end):
+        spec = dict(spec)
+        source = spec.pop("source")
+        if source not in DATA_SOURCES:
+            raise ValueError(f"Unknown data source '{source}' for strategy {self.name}, expected one of {sorted(DATA_SOURCES)}")
+        return DATA_SOURCES[source](self.tickers, start, end, **spec)
+
+
+class FundRegistry:
+    """
+    Fund name -> StrategyEnsemble over [start, end], described by the `funds` section of config.yaml.
+    Listing funds, their strategies and tickers only reads the config. A fund's data is loaded and its
+    strategies initialised the first time it is looked up, then reused for the life of the registry.
+    """
+    def __init__(self, start, end, config_path=CONFIG_PATH):
+        self.start, self.end = start, end
+        self.funds = {
+            fund: [StrategyDescriptor(name, spec) for name, spec in strategies.items()]
+            for fund, strategies in _load_funds(config_path, os.path.getmtime(config_path)).items()
+        }
+        self._built = {}  # {fund: StrategyEnsemble}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, fund) -> StrategyEnsemble:
+        with self._lock:
+            if fund not in self._built:
+                self._built[fund] = StrategyEnsemble({
+                    descriptor.name: descriptor.build(self.start, self.end) for descriptor in self.funds[fund]
+                })
+            return self._built[fund]
+
+    def __iter__(self):
+        return iter(self.funds)
+
+    def __len__(self):
+        return len(self.funds)
+
+    def __contains__(self, fund):
+        return fund in self.funds
+
+    def keys(self):
+        return self.funds.keys()
+
+    def fingerprint(self, fund) -> list:
+        """
+        A fund's configuration from its descriptors alone, for cache keys that mustn't build the strategies.
+        """
+        return [descriptor.fingerprint() for descriptor in self.funds[fund]]
+
+    def strategies(self, fund) -> list:
+        return [descriptor.name for descriptor in self.funds[fund]]
+
+    def tickers(self, fund) -> list:
+        return sorted({t for descriptor in self.funds[fund] for t in descriptor.tickers})
+
+
+if __name__ == '__main__':
+    registry = FundRegistry("2020-01-01", "2024-12-31")
+    for fund in registry:
+        print(fund, registry.strategies(fund), registry.tickers(fund))
+    print(registry["Querido Capital Fund 3"].aggregate_allocations())
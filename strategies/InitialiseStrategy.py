@@ -1,6 +1,8 @@
 import datetime
+import pandas as pd
 import yfinance as yf
 from datasets.GetSeries import GetSeries
+from datasets.PointInTimeView import PointInTimeView
 from strategies.signal_generation.MomentumStrategy import MomentumStrategy
 from strategies.signal_generation.MeanReversionStrategy import MeanReversionStrategy
 from strategies.allocations.VolatilityScaledAllocator import VolatilityScaledAllocator
@@ -10,7 +12,6 @@ class InitialiseStrategy:
     def __init__(self, strategy_cls, allocator_cls, tickers, start, end, strategy_kwargs=None, allocator_kwargs=None):
         self.tickers = tickers
         self.start = start
-        self.end = end
         self.strategy_cls = strategy_cls
         self.allocator_cls = allocator_cls
         self.strategy_kwargs = strategy_kwargs or {}
@@ -18,11 +19,73 @@ class InitialiseStrategy:
 
         self.data = GetSeries(ticker=tickers, start=start, end=end).fetch_prices()
         self.vol = GetSeries(ticker=tickers, start=start, end=end).fetch_volatility()
+        self.view = PointInTimeView(self.data)
+        self.end = end
+        self._signal_panel = None
+
+    @property
+    def end(self):
+        return self._end
+
+    @end.setter
+    def end(self, date):
+        # The engine moves `end` forward each bar, strategies only ever see data up to it
+        self._end = date
+        self.view.advance_to(date)
+
+    def fingerprint(self) -> dict:
+        """
+        Configuration that determines this strategy's output, used to key cached backtests.
+        """
+        return {
+            "strategy": self.strategy_cls,
+            "allocator": self.allocator_cls,
+            "tickers": [self.tickers] if isinstance(self.tickers, str) else list(self.tickers),
+            "start": pd.Timestamp(self.start),
+            "strategy_kwargs": self.strategy_kwargs,
+            "allocator_kwargs": self.allocator_kwargs,
+        }
+
+    def signal_panel(self):
+        """
+        Full-history signal matrix, computed once and reused for every bar of a backtest.
+        Returns None if the strategy only supports generate_positions().
+        """
+        if self._signal_panel is None:
+            try:
+                self._signal_panel = self.strategy_cls(data=self.data, **self.strategy_kwargs).generate_signal_panel()
+            except NotImplementedError:
+                return None
+        return self._signal_panel
+
+    def weight_panel(self):
+        """
+        Target weights for every bar as a Date x ticker frame, rows that hold cash are all zero.
+        """
+        panel = self.signal_panel()
+        allocator = self.allocator_cls(**self.allocator_kwargs)
+        if panel is not None:
+            return allocator.allocate_panel(panel)
+        # No vectorised signals, replay the strategy bar by bar
+        end, rows = self.end, []
+        for date in self.data.index:
+            self.end = date
+            rows.append(self.run()[1])
+        self.end = end
+        weights = pd.DataFrame(rows, index=self.data.index).reindex(columns=self.data.columns)
+        return weights.fillna(0.0)
 
     def run(self):
-        strategy = self.strategy_cls(data=self.data, **self.strategy_kwargs)
-        signals = strategy.generate_positions()
+        panel = self.signal_panel()
+        if panel is not None:
+            # Look up the row for the current bar rather than re-running the strategy over the whole history
+            row = len(self.view) - 1
+            signals = panel.iloc[row].dropna().to_dict() if row >= 0 else {}
+        else:
+            strategy = self.strategy_cls(data=self.view.frame, **self.strategy_kwargs)
+            signals = strategy.generate_positions()
         allocator = self.allocator_cls(**self.allocator_kwargs)
+        allocator.end = self.end
         weights = allocator.allocate(signals)
         return signals, weights
 
@@ -3,6 +3,7 @@ from strategies.signal_generation.MomentumStrategy import MomentumStrategy
 from strategies.allocations.VolatilityScaledAllocator import VolatilityScaledAllocator
 from strategies.InitialiseStrategy import InitialiseStrategy
 from datasets.GetSeries import GetSeries
+import pandas as pd
 
 class StrategyEnsemble:
     def __init__(self, capital_allocation: dict):
@@ -11,6 +12,9 @@ class StrategyEnsemble:
         """
         self.capital_allocation = capital_allocation
 
+    def fingerprint(self) -> dict:
+        return {name: [strategy_runner, capital_fraction] for name, (strategy_runner, capital_fraction) in self.capital_allocation.items()}
+
     def aggregate_allocations(self) -> dict:
         combined = {}
         for name, (strategy_runner, capital_fraction) in self.capital_allocation.items():
@@ -22,6 +26,23 @@ class StrategyEnsemble:
 
         return combined
 
+    def weight_panel(self) -> pd.DataFrame:
+        """
+        Capital-weighted sum of each strategy's target weight panel, as a Date x ticker frame.
+        """
+        panels = [
+            strategy_runner.weight_panel() * capital_fraction
+            for strategy_runner, capital_fraction in self.capital_allocation.values()
+        ]
+        dates = panels[0].index
+        for panel in panels[1:]:
+            dates = dates.union(panel.index)
+        combined = pd.DataFrame(index=dates)
+        for panel in panels:
+            # Carry each strategy's last weights over dates it has no bar for, as run() does
+            combined = combined.add(panel.reindex(dates).ffill().fillna(0.0), fill_value=0.0)
+        return combined.fillna(0.0)
+
 
 if __name__ == '__main__':
     tickers = ["AAPL", "MSFT", "GOOG", "TSLA"]
@@ -1,11 +1,29 @@
+import numpy as np
+import pandas as pd
+
+
 class BaseAllocator:
+    end = None  # Current backtest date, set by InitialiseStrategy before each allocate() call
+
     def allocate(self, signals: dict) -> dict:
         raise NotImplementedError
 
-    def _normalize_weights(self, weights: dict) -> dict:         # Todo: Consider how we handle no signal
+    def _normalize_weights(self, weights: dict) -> dict:
         total_weight = sum(weights.values())
         if total_weight == 0:
-            # return {"CASH": 1.0}
-            return {"AAPL": 1.0}  # Default to a single asset with full weight if no signals are present        # Todo: Allocate to the index?
+            return {"CASH": 1.0}  # No signals (e.g. before the lookback has filled), hold cash        # Todo: Allocate to the index?
         weights = {k: w / total_weight for k, w in weights.items()}
-        return weights
\ No newline at end of file
+        return weights
+
+    def allocate_panel(self, signal_panel: pd.DataFrame) -> pd.DataFrame:
+        """
+        Target weights for every row of a Date x ticker signal panel. Rows with no signal are all zero (i.e. cash).
+        Falls back to calling allocate() per row, subclasses override with a vectorised version.
+        """
+        rows = [self.allocate(row.dropna().to_dict()) for _, row in signal_panel.iterrows()]
+        weights = pd.DataFrame(rows, index=signal_panel.index).reindex(columns=signal_panel.columns)
+        return weights.fillna(0.0)
+
+    def _normalize_panel(self, raw_weights: pd.DataFrame) -> pd.DataFrame:
+        total_weight = raw_weights.sum(axis=1)
+        return raw_weights.div(total_weight.where(total_weight != 0, np.inf), axis=0)
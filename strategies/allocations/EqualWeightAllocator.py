@@ -7,3 +7,6 @@ class EqualWeightAllocator(BaseAllocator):
         weights = {k: 1/n if k in active else 0 for k in signals} if n > 0 else {k: 0 for k in signals}
         return self._normalize_weights(weights)
 
+    def allocate_panel(self, signal_panel):
+        active = (signal_panel.fillna(0) != 0).astype(float)
+        return self._normalize_panel(active)
@@ -1,17 +1,20 @@
 import numpy as np
 import pandas as pd
-from allocators.base_allocator import BaseAllocator
+from strategies.allocations.BaseAllocator import BaseAllocator
 
 class TrackingErrorAllocator(BaseAllocator):
-    def __init__(self, benchmark_weights: dict, risk_budget: float = 0.05):
+    def __init__(self, benchmark_weights: dict, risk_budget: float = 0.05, risk_model=None):
         self.benchmark_weights = benchmark_weights
         self.risk_budget = risk_budget
+        self.risk_model = risk_model  # CovarianceRiskModel, used when allocate() isn't given a covariance
 
-    def allocate(self, signals: dict, covariance: pd.DataFrame) -> dict:
+    def allocate(self, signals: dict, covariance: pd.DataFrame = None) -> dict:
         """
         signals: {ticker: signal strength (can be -1, 0, 1 or continuous)}
-        covariance: asset return covariance matrix (daily)
+        covariance: asset return covariance matrix (daily), defaults to the risk model's matrix at self.end
         """
+        if covariance is None:
+            covariance = self.risk_model.covariance(self.end)
         tickers = list(signals.keys())
         signal_vec = np.array([signals[t] for t in tickers])
         bm_vec = np.array([self.benchmark_weights.get(t, 0) for t in tickers])
@@ -28,3 +31,12 @@ class TrackingErrorAllocator(BaseAllocator):
 
         final_weights = bm_vec + scale * signal_delta
         return dict(zip(tickers, final_weights))
+
+    def allocate_panel(self, signal_panel: pd.DataFrame) -> pd.DataFrame:
+        # Row by row, each date prices the delta with that date's covariance
+        rows = [
+            self.allocate(row.dropna().to_dict(), self.risk_model.covariance(date))
+            for date, row in signal_panel.iterrows()
+        ]
+        weights = pd.DataFrame(rows, index=signal_panel.index).reindex(columns=signal_panel.columns)
+        return weights.fillna(0.0)
@@ -1,13 +1,31 @@
+import pandas as pd
 from strategies.allocations.BaseAllocator import BaseAllocator
 from datasets.GetSeries import GetSeries
+from datasets.VolatilityPanel import VolatilityPanel
 
 class VolatilityScaledAllocator(BaseAllocator):
     def __init__(self, vol_data):
-        self.vol_data = vol_data
+        self.vol_data = vol_data  # VolatilityPanel (indexed by the backtest date) or a static {ticker: vol} dict
+
+    def _vols(self) -> dict:
+        if isinstance(self.vol_data, VolatilityPanel):
+            return self.vol_data.at(self.end).dropna().to_dict()
+        return self.vol_data
 
     def allocate(self, signals: dict) -> dict:
-        active = {k: v for k, v in signals.items() if v != 0}
-        inv_vol = {k: 1 / self.vol_data[k] for k in active}
+        vols = self._vols()
+        active = {k: v for k, v in signals.items() if v != 0 and k in vols}  # No volatility estimate yet, no position
+        inv_vol = {k: 1 / vols[k] for k in active}
         total = sum(inv_vol.values())
         weights = {k: inv_vol[k] / total if k in active else 0 for k in signals}
         return self._normalize_weights(weights)
+
+    def allocate_panel(self, signal_panel):
+        active = signal_panel.fillna(0) != 0
+        if isinstance(self.vol_data, VolatilityPanel):
+            # Each date is scaled by that date's volatility estimates
+            vols = self.vol_data.panel.reindex(columns=signal_panel.columns)
+            vols = vols.reindex(vols.index.union(signal_panel.index)).ffill().reindex(signal_panel.index)
+            return self._normalize_panel((1 / vols).where(active, 0.0).fillna(0.0))
+        inv_vol = 1 / pd.Series(self.vol_data).reindex(signal_panel.columns)
+        return self._normalize_panel(active.mul(inv_vol, axis=1).where(active, 0.0))
@@ -4,3 +4,18 @@ class BaseStrategy:
 
     def generate_positions(self) -> dict:
         raise NotImplementedError("Implement in subclass")
+
+    def generate_signal_panel(self):
+        """
+        Signals for every bar in one vectorised pass, as a Date x ticker frame (NaN until a ticker has enough history).
+        Row t must only depend on data up to t so it can be looked up during a backtest.
+        """
+        raise NotImplementedError("Implement in subclass")
+
+    @classmethod
+    def generate_signal_panels(cls, data, param_sets: list) -> list:
+        """
+        Signal panels for many parameter settings against one price frame, in the same order as param_sets.
+        Subclasses batch settings that share intermediate results.
+        """
+        return [cls(data, **params).generate_signal_panel() for params in param_sets]
@@ -1,3 +1,4 @@
+import pandas as pd
 from strategies.signal_generation.BaseStrategy import BaseStrategy
 from strategies.allocations.EqualWeightAllocator import EqualWeightAllocator
 from datasets.GetSeries import GetSeries
@@ -16,6 +17,9 @@ class BuyAndHoldStrategy(BaseStrategy):
             positions[ticker] = 1
         return positions
 
+    def generate_signal_panel(self) -> pd.DataFrame:
+        return pd.DataFrame(1.0, index=self.data.index, columns=self.data.columns)
+
 
 if __name__ == '__main__':
     tickers = ['^SPX']
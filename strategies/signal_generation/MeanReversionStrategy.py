@@ -1,3 +1,5 @@
+import numpy as np
+import pandas as pd
 from strategies.signal_generation.BaseStrategy import BaseStrategy
 from strategies.allocations.EqualWeightAllocator import EqualWeightAllocator
 from datasets.GetSeries import GetSeries
@@ -26,6 +28,31 @@ class MeanReversionStrategy(BaseStrategy):
                 positions[ticker] = 0.0
         return positions
 
+    def generate_signal_panel(self) -> pd.DataFrame:
+        rolling = self.data.rolling(self.lookback)
+        zscore = (self.data - rolling.mean()) / rolling.std()
+        signals = np.select([zscore < -self.bound, zscore > self.bound], [1.0, -1.0], 0.0)
+        panel = pd.DataFrame(signals, index=self.data.index, columns=self.data.columns)
+        panel.iloc[:self.lookback - 1] = np.nan  # Needs lookback bars
+        return panel
+
+    @classmethod
+    def generate_signal_panels(cls, data, param_sets: list) -> list:
+        # Rolling z-scores are computed once per lookback, every bound is applied to them in one broadcast
+        panels = [None] * len(param_sets)
+        by_lookback = {}
+        for i, params in enumerate(param_sets):
+            by_lookback.setdefault(params.get("lookback", 20), []).append(i)
+        for lookback, positions in by_lookback.items():
+            rolling = data.rolling(lookback)
+            zscore = ((data - rolling.mean()) / rolling.std()).to_numpy()
+            bounds = np.array([param_sets[i].get("bound", 0.5) for i in positions])[:, None, None]
+            signals = np.select([zscore < -bounds, zscore > bounds], [1.0, -1.0], 0.0)
+            signals[:, :lookback - 1] = np.nan
+            for i, signal in zip(positions, signals):
+                panels[i] = pd.DataFrame(signal, index=data.index, columns=data.columns)
+        return panels
+
 
 if __name__ == '__main__':
     tickers = ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'TSLA']
@@ -1,3 +1,5 @@
+import numpy as np
+import pandas as pd
 from strategies.signal_generation.BaseStrategy import BaseStrategy
 from strategies.allocations.VolatilityScaledAllocator import VolatilityScaledAllocator
 from datasets.GetSeries import GetSeries
@@ -27,6 +29,28 @@ class MomentumStrategy(BaseStrategy):
 
         return positions
 
+    def generate_signal_panel(self) -> pd.DataFrame:
+        momentum = self.data / self.data.shift(self.lookback) - 1
+        signals = np.select([momentum > self.threshold, momentum < -self.threshold], [1.0, -1.0], 0.0)
+        panel = pd.DataFrame(signals, index=self.data.index, columns=self.data.columns)
+        return panel.where(momentum.notna())  # Needs lookback + 1 bars
+
+    @classmethod
+    def generate_signal_panels(cls, data, param_sets: list) -> list:
+        # Lookback returns are computed once per lookback, every threshold is applied to them in one broadcast
+        panels = [None] * len(param_sets)
+        by_lookback = {}
+        for i, params in enumerate(param_sets):
+            by_lookback.setdefault(params.get("lookback", 20), []).append(i)
+        for lookback, positions in by_lookback.items():
+            momentum = (data / data.shift(lookback) - 1).to_numpy()
+            thresholds = np.array([param_sets[i].get("threshold", 0.02) for i in positions])[:, None, None]
+            signals = np.select([momentum > thresholds, momentum < -thresholds], [1.0, -1.0], 0.0)
+            signals[:, np.isnan(momentum)] = np.nan
+            for i, signal in zip(positions, signals):
+                panels[i] = pd.DataFrame(signal, index=data.index, columns=data.columns)
+        return panels
+
 
 if __name__ == '__main__':
     tickers = ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'TSLA']
@@ -0,0 +1,29 @@
+import pandas as pd
+from strategies.signal_generation.BaseStrategy import BaseStrategy
+
+
+class WalkForwardStrategy(BaseStrategy):
+    """
+    Stitches another strategy's signals from a schedule of re-fitted parameters.
+    schedule: [(first date the parameters apply, {param: value})] in date order, no signals before the first entry.
+    """
+    def __init__(self, data: dict, strategy_cls, schedule: list):
+        super().__init__(data)
+        self.strategy_cls = strategy_cls
+        self.schedule = schedule
+
+    def generate_positions(self) -> dict:
+        row = self.generate_signal_panel().iloc[-1]
+        return row.dropna().to_dict()
+
+    def generate_signal_panel(self) -> pd.DataFrame:
+        # Signals are causal, so each window is a slice of its setting's full-history panel, computed once per setting
+        unique_params = {tuple(sorted(params.items())): params for _, params in self.schedule}
+        full_panels = dict(zip(unique_params, self.strategy_cls.generate_signal_panels(self.data, list(unique_params.values()))))
+
+        panel = pd.DataFrame(float("nan"), index=self.data.index, columns=self.data.columns)
+        starts = [pd.Timestamp(start) for start, _ in self.schedule] + [pd.Timestamp.max]
+        for (_, params), start, stop in zip(self.schedule, starts[:-1], starts[1:]):
+            window = (panel.index >= start) & (panel.index < stop)
+            panel.loc[window] = full_panels[tuple(sorted(params.items()))].loc[window]
+        return panel
@@ -0,0 +1,18 @@
+from utils.cache_keys import config_key
+
+
+class Panel:
+    end_date_fields = ("end",)
+
+    def __init__(self, end):
+        self.end = end
+
+    def fingerprint(self):
+        return {"window": 20, "end": self.end}
+
+
+def test_ignore_end_dates_drops_only_declared_fields():
+    assert config_key(Panel("2021-06-30"), ignore_end_dates=True) == config_key(Panel("2022-06-30"), ignore_end_dates=True)
+    assert config_key(Panel("2021-06-30")) != config_key(Panel("2022-06-30"))
+    # A strategy parameter that happens to be called "end" still separates configs
+    assert config_key({"end": 5}, ignore_end_dates=True) != config_key({"end": 10}, ignore_end_dates=True)
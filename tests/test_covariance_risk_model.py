@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import stats.CovarianceRiskModel as risk_model
+from stats.CovarianceRiskModel import CovarianceRiskModel
+
+TICKERS = ["AAA", "BBB", "CCC", "DDD"]
+DATES = pd.bdate_range("2000-01-03", periods=3000)
+
+
+def synthetic_returns():
+    rng = np.random.default_rng(11)
+    # A large common drift makes the raw sums big next to the covariance, where round-off shows first
+    return pd.DataFrame(0.05 + rng.normal(0, 0.01, (len(DATES), len(TICKERS))), index=DATES, columns=TICKERS)
+
+
+RETURNS = synthetic_returns()
+
+
+class SyntheticSeries:
+    def __init__(self, ticker, start, end):
+        self.tickers = ticker
+
+    def fetch_returns(self):
+        return RETURNS[self.tickers]
+
+
+def model(monkeypatch, method, window=252, tickers=TICKERS):
+    monkeypatch.setattr(risk_model, "GetSeries", SyntheticSeries)
+    monkeypatch.setattr(CovarianceRiskModel, "_models", type(CovarianceRiskModel._models)())
+    monkeypatch.setattr(CovarianceRiskModel, "_matrices", type(CovarianceRiskModel._matrices)())
+    return CovarianceRiskModel.shared(tickers, DATES[0], DATES[-1], method=method, window=window)
+
+
+def test_sample_covariance_matches_window_after_long_history(monkeypatch):
+    covariance = model(monkeypatch, "sample", window=100)
+    for t in [50, 1000, 2999]:
+        expected = RETURNS.iloc[max(t - 99, 0):t + 1].cov()
+        np.testing.assert_allclose(covariance.covariance(DATES[t]).to_numpy(), expected.to_numpy(), rtol=1e-9, atol=1e-15)
+
+
+def test_revisited_dates_match_walking_forward(monkeypatch):
+    covariance = model(monkeypatch, "ledoit_wolf", window=100)
+    late = covariance.covariance(DATES[2500]).to_numpy()
+    early = covariance.covariance(DATES[1234]).to_numpy()
+
+    fresh = model(monkeypatch, "ledoit_wolf", window=100)
+    np.testing.assert_allclose(fresh.covariance(DATES[1234]).to_numpy(), early, rtol=1e-9)
+    np.testing.assert_allclose(fresh.covariance(DATES[2500]).to_numpy(), late, rtol=1e-9)
+
+
+def test_shared_models_are_bounded(monkeypatch):
+    first = model(monkeypatch, "sample", tickers=TICKERS[:2])
+    for window in range(10, 10 + CovarianceRiskModel.max_cached_models):
+        CovarianceRiskModel.shared(TICKERS[:2], DATES[0], DATES[-1], method="sample", window=window)
+
+    assert len(CovarianceRiskModel._models) == CovarianceRiskModel.max_cached_models
+    assert first not in CovarianceRiskModel._models.values()
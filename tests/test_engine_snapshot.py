@@ -0,0 +1,147 @@
+import functools
+import numpy as np
+import pandas as pd
+import pandas.testing as tm
+import pytest
+import simulation.StrategyExecution as execution
+from simulation.StrategyExecution import BacktestEngine, TransactionCostModel, run_engine
+from simulation.EngineSnapshot import read_checkpoint
+from simulation.ResultsStore import ResultsStore
+from strategies.StrategyEnsemble import StrategyEnsemble
+
+TICKERS = ["AAA", "BBB", "CCC"]
+START, SPLIT, END = "2021-01-04", "2021-03-31", "2021-06-30"
+
+
+def synthetic_prices():
+    dates = pd.bdate_range(START, END)
+    rng = np.random.default_rng(7)
+    returns = rng.normal(0.0005, 0.02, size=(len(dates), len(TICKERS)))
+    return pd.DataFrame(100 * np.cumprod(1 + returns, axis=0), index=dates, columns=TICKERS)
+
+
+PRICES = synthetic_prices()
+
+
+class SyntheticSeries:
+    def __init__(self, start, end):
+        self.start, self.end = start, end
+
+    def fetch_prices(self):
+        return PRICES.loc[self.start:self.end]
+
+
+class SyntheticEngine(BacktestEngine):
+    # Prices from the synthetic panel instead of a download
+    def fetch_series(self, tickers, start, end):
+        return SyntheticSeries(start, end)
+
+
+class TrailingWinner:
+    """
+    All in the ticker with the best trailing 5-bar return up to end, so trades depend on the bar being run.
+    """
+    def __init__(self, lookback=5):
+        self.lookback = lookback
+        self.end = END
+
+    def fingerprint(self):
+        return {"class": "TrailingWinner", "lookback": self.lookback}
+
+    def run(self):
+        history = PRICES.loc[:self.end]
+        if len(history) <= self.lookback:
+            return {}, {}
+        winner = history.iloc[-1].div(history.iloc[-1 - self.lookback]).idxmax()
+        return {winner: 1}, {winner: 1.0}
+
+
+def ensemble():
+    return StrategyEnsemble({"Winner": (TrailingWinner(), 0.6), "Slow Winner": (TrailingWinner(lookback=20), 0.4)})
+
+
+def engine(end, strategy=None):
+    return SyntheticEngine(TICKERS, strategy or ensemble(), TransactionCostModel(), START, end)
+
+
+def assert_same_trades(actual, expected):
+    assert list(actual.columns) == list(expected.columns)
+    for column in expected.columns:
+        tm.assert_series_equal(actual[column], expected[column], obj=f"trades[{column!r}]")
+
+
+def full_run():
+    return engine(END).run()
+
+
+def test_resumed_run_matches_full_run():
+    returns, equity_curve, trades, positions = full_run()
+
+    first = engine(SPLIT)
+    prefix = first.run()
+    resumed = engine(END).run(resume_from=first.snapshot(), prefix=prefix)
+
+    assert_same_trades(resumed[2], trades)
+    tm.assert_series_equal(resumed[1], equity_curve)
+    tm.assert_frame_equal(resumed[3], positions)
+
+
+def test_fork_from_checkpoint_matches_full_run(tmp_path):
+    _, equity_curve, trades, positions = full_run()
+
+    engine(SPLIT).run(checkpoint_every=20, checkpoint_dir=str(tmp_path))
+    snapshot, prefix = read_checkpoint(str(tmp_path))
+    # The checkpoints' segments stitch back into the run up to the last one
+    tm.assert_frame_equal(prefix[3], positions[positions["Date"] <= snapshot.date])
+    forked = SyntheticEngine.from_snapshot(snapshot, prefix, ensemble(), END).run()
+
+    assert_same_trades(forked[2], trades)
+    tm.assert_series_equal(forked[1], equity_curve)
+    tm.assert_frame_equal(forked[3], positions)
+
+
+def test_checkpoints_need_a_directory():
+    with pytest.raises(ValueError):
+        engine(SPLIT).run(checkpoint_every=20)
+
+
+def test_stored_trades_match_full_run(tmp_path):
+    results = full_run()
+    store = ResultsStore(cache_dir=str(tmp_path))
+    store.put("run", results)
+
+    assert_same_trades(store.get("run")[2], results[2])
+
+
+def test_run_engine_only_simulates_new_bars(tmp_path, monkeypatch):
+    monkeypatch.setattr(execution, "ResultsStore", functools.partial(ResultsStore, cache_dir=str(tmp_path)))
+    monkeypatch.setattr(BacktestEngine, "fetch_series", SyntheticEngine.fetch_series)
+    simulated = []
+    log_account = BacktestEngine._log_account
+    monkeypatch.setattr(BacktestEngine, "_log_account", lambda self, t, prices: simulated.append(t) or log_account(self, t, prices))
+    strategy = ensemble()
+
+    run_engine(TICKERS, strategy, START, SPLIT)
+    simulated.clear()
+    # The end date moves forward, the stored run is resumed from its last bar
+    _, equity_curve, trades, positions = run_engine(TICKERS, strategy, START, END)
+
+    assert simulated == list(range(len(PRICES.loc[:SPLIT]), len(PRICES)))
+    full = full_run()
+    assert_same_trades(trades, full[2])
+    tm.assert_series_equal(equity_curve, full[1])
+    tm.assert_frame_equal(positions, full[3])
+
+
+def test_resume_after_readjustment_runs_full_history(monkeypatch):
+    first = engine(SPLIT)
+    prefix = first.run()
+    snapshot = first.snapshot()
+
+    # A dividend after the snapshot rescales every earlier close
+    monkeypatch.setitem(globals(), "PRICES", PRICES.assign(AAA=PRICES["AAA"] * 0.98))
+    _, equity_curve, trades, _ = full_run()
+    resumed = engine(END).run(resume_from=snapshot, prefix=prefix)
+
+    assert_same_trades(resumed[2], trades)
+    tm.assert_series_equal(resumed[1], equity_curve)
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pandas.testing as tm
+from datasets.PriceCache import PriceCache
+
+TICKERS = ["AAA", "BBB"]
+
+
+def vendor_prices():
+    dates = pd.bdate_range("2021-01-01", "2021-12-31")
+    rng = np.random.default_rng(3)
+    return pd.DataFrame(100 * np.cumprod(1 + rng.normal(0, 0.01, (len(dates), len(TICKERS))), axis=0), index=dates, columns=TICKERS)
+
+
+class StubbedPriceCache(PriceCache):
+    """
+    Downloads served from an in-memory vendor panel. Calls listed in fail return nothing, as an outage would.
+    """
+    def __init__(self, cache_dir, prices):
+        super().__init__(cache_dir)
+        self.prices = prices
+        self.calls = []
+        self.fail = set()
+
+    def _download(self, tickers, start, end):
+        self.calls.append((list(tickers), pd.Timestamp(start), pd.Timestamp(end)))
+        if len(self.calls) in self.fail:
+            return pd.DataFrame()
+        return self.prices.loc[(self.prices.index >= start) & (self.prices.index < end), list(tickers)]
+
+
+def expected(prices, start, end):
+    frame = prices.loc[(prices.index >= start) & (prices.index < end)]
+    return frame.rename_axis("Date")
+
+
+def test_gaps_are_merged_and_only_missing_ranges_downloaded(tmp_path):
+    prices = vendor_prices()
+    cache = StubbedPriceCache(str(tmp_path), prices)
+    cache.get(TICKERS, "2021-03-01", "2021-06-01")
+    result = cache.get(TICKERS, "2021-02-01", "2021-08-02")
+
+    tm.assert_frame_equal(result, expected(prices, "2021-02-01", "2021-08-02"), check_freq=False)
+    # One batched download per gap, each only reaching a week past what was already stored
+    assert [(start, end) for _, start, end in cache.calls[1:]] == [
+        (pd.Timestamp("2021-01-25"), pd.Timestamp("2021-03-08")),
+        (pd.Timestamp("2021-05-25"), pd.Timestamp("2021-08-09")),
+    ]
+    cache.get(TICKERS, "2021-02-01", "2021-08-02")
+    assert len(cache.calls) == 3
+
+
+def test_empty_response_is_retried(tmp_path):
+    prices = vendor_prices()
+    cache = StubbedPriceCache(str(tmp_path), prices)
+    cache.get(TICKERS, "2021-03-01", "2021-06-01")
+    cache.fail = {2}
+    result = cache.get(TICKERS, "2021-03-01", "2021-07-01")
+    tm.assert_frame_equal(result, expected(prices, "2021-03-01", "2021-06-01"), check_freq=False)
+
+    # The failed tail wasn't recorded as covered, so it's downloaded again and filled in
+    result = cache.get(TICKERS, "2021-03-01", "2021-07-01")
+    assert len(cache.calls) == 3
+    tm.assert_frame_equal(result, expected(prices, "2021-03-01", "2021-07-01"), check_freq=False)
+
+
+def test_changed_adjustment_basis_refetches_history(tmp_path):
+    prices = vendor_prices()
+    cache = StubbedPriceCache(str(tmp_path), prices)
+    cache.get(TICKERS, "2021-03-01", "2021-06-01")
+
+    # A dividend rescales AAA's whole adjusted history
+    cache.prices = prices.assign(AAA=prices["AAA"] * 0.98)
+    result = cache.get(TICKERS, "2021-03-01", "2021-07-01")
+    tm.assert_frame_equal(result, expected(cache.prices, "2021-03-01", "2021-07-01"), check_freq=False)
+    assert cache.calls[-1] == (["AAA"], pd.Timestamp("2021-03-01"), pd.Timestamp("2021-07-01"))
+
+    # Read back from disk on the new basis
+    reloaded = StubbedPriceCache(str(tmp_path), cache.prices).get(TICKERS, "2021-03-01", "2021-07-01")
+    tm.assert_frame_equal(reloaded, result, check_freq=False)
+
+
+def test_failed_refetch_keeps_stored_history(tmp_path):
+    prices = vendor_prices()
+    cache = StubbedPriceCache(str(tmp_path), prices)
+    cache.get(["AAA"], "2021-03-01", "2021-06-01")
+
+    cache.prices = prices.assign(AAA=prices["AAA"] * 0.98)
+    cache.fail = {3}  # The gap download succeeds, the full refetch it triggers doesn't
+    result = cache.get(["AAA"], "2021-03-01", "2021-07-01")
+    tm.assert_frame_equal(result, expected(prices[["AAA"]], "2021-03-01", "2021-06-01"), check_freq=False)
+    assert cache._load("AAA")[1] == (pd.Timestamp("2021-03-01"), pd.Timestamp("2021-06-01"))
+
+    # Retried on the next call, now on the new basis
+    result = cache.get(["AAA"], "2021-03-01", "2021-07-01")
+    tm.assert_frame_equal(result, expected(cache.prices[["AAA"]], "2021-03-01", "2021-07-01"), check_freq=False)
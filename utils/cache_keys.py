@@ -0,0 +1,53 @@
+import datetime
+import hashlib
+import json
+import numpy as np
+import pandas as pd
+
+
+def fingerprint(obj, ignore_end_dates=False):
+    """
+    Canonical JSON-able form of a config: strategies, classes, dates and frames included.
+    Equal configs give equal fingerprints across processes and restarts.
+    ignore_end_dates: drop the fields objects list in their end_date_fields, e.g. VolatilityPanel's "end", to
+    match configs that differ only in how far their data runs. Keys in plain dicts (user kwargs) are kept.
+    """
+    if hasattr(obj, "fingerprint") and not isinstance(obj, type):
+        fields = obj.fingerprint()
+        if ignore_end_dates:
+            fields = {k: v for k, v in fields.items() if k not in getattr(obj, "end_date_fields", ())}
+        return fingerprint(fields, ignore_end_dates)
+    if isinstance(obj, dict):
+        return {
+            str(k): fingerprint(v, ignore_end_dates)
+            for k, v in sorted(obj.items(), key=lambda item: str(item[0]))
+        }
+    if isinstance(obj, (list, tuple)):
+        return [fingerprint(v, ignore_end_dates) for v in obj]
+    if isinstance(obj, (set, frozenset)):
+        return sorted(fingerprint(v, ignore_end_dates) for v in obj)
+    if isinstance(obj, type):
+        return f"{obj.__module__}.{obj.__qualname__}"
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        hashed = pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes()
+        labels = list(map(str, obj.columns)) if isinstance(obj, pd.DataFrame) else [str(obj.name)]
+        return {"frame": hashlib.sha256(hashed).hexdigest(), "columns": labels}
+    if isinstance(obj, np.ndarray):
+        return {"array": hashlib.sha256(np.ascontiguousarray(obj).tobytes()).hexdigest(), "shape": list(obj.shape)}
+    if isinstance(obj, (datetime.date, pd.Timestamp)):
+        return pd.Timestamp(obj).isoformat()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if obj is None or isinstance(obj, (bool, int, float, str)):
+        return obj
+    raise TypeError(f"Can't fingerprint {type(obj).__name__}")
+
+
+def config_key(*parts, ignore_end_dates=False) -> str:
+    payload = json.dumps(fingerprint(parts, ignore_end_dates), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+def as_date(date) -> str:
+    # "2020-01-01", datetime.date and Timestamps for the same day share a key
+    return pd.Timestamp(date).date().isoformat()
@@ -2,78 +2,22 @@
 import plotly.express as px
 import datetime
 import streamlit as st
-from strategies.InitialiseStrategy import InitialiseStrategy
-from strategies.StrategyEnsemble import StrategyEnsemble
-from strategies.signal_generation.MeanReversionStrategy import MeanReversionStrategy
-from strategies.allocations.EqualWeightAllocator import EqualWeightAllocator
-from datasets.GetSeries import GetSeries
+from strategies.FundRegistry import FundRegistry
 
-# helper_functions.py
-from strategies.InitialiseStrategy import InitialiseStrategy
-from strategies.StrategyEnsemble import StrategyEnsemble
-from strategies.signal_generation.MeanReversionStrategy import MeanReversionStrategy
-from strategies.signal_generation.MomentumStrategy import MomentumStrategy
-from strategies.allocations.VolatilityScaledAllocator import VolatilityScaledAllocator
-from strategies.allocations.EqualWeightAllocator import EqualWeightAllocator
-from datasets.GetSeries import GetSeries
-
-def build_fund_registry(start, end):        # Todo: Link to config file
-    def init_strat(strategy_cls, allocator_cls, tickers, strat_kwargs, alloc_kwargs, weight):
-        strat = InitialiseStrategy(
-            strategy_cls=strategy_cls,
-            allocator_cls=allocator_cls,
-            tickers=tickers,
-            start=start,
-            end=end,
-            strategy_kwargs=strat_kwargs,
-            allocator_kwargs=alloc_kwargs
-        )
-        return strat, weight
-
-    # Example volatility data for volatility-scaled allocator
-    tickers1 = ["HE=F", "KC=F", "LE=F"]
-    tickers2 = ["SGR.AX", "CHN.AX", "TLS.XA"]
-    vol_data_1 = GetSeries(ticker=tickers1, start=start, end=end).fetch_volatility()
-    vol_data_2 = GetSeries(ticker=tickers2, start=start, end=end).fetch_volatility()
-
-    return {
-        "Querido Capital Fund 1": StrategyEnsemble({
-            "Momentum": init_strat(
-                MomentumStrategy, VolatilityScaledAllocator, tickers1,
-                {"lookback": 20, "threshold": 0.02},
-                {"vol_data": vol_data_1},
-                0.4
-            ),
-            "Mean Reversion": init_strat(
-                MeanReversionStrategy, VolatilityScaledAllocator, tickers2,
-                {"lookback": 20, "bound": 1.5},
-                {"vol_data": vol_data_2},
-                0.6
-            ),
-        }),
-        "Querido Capital Fund 2": StrategyEnsemble({
-            "Momentum": init_strat(
-                MomentumStrategy, VolatilityScaledAllocator, tickers1,
-                {"lookback": 20, "threshold": 0.02},
-                {"vol_data": vol_data_1},
-                0.8
-            ),
-            "Mean Reversion": init_strat(
-                MeanReversionStrategy, VolatilityScaledAllocator, tickers2,
-                {"lookback": 20, "bound": 1.5},
-                {"vol_data": vol_data_2},
-                0.2
-            ),
-        }),
-        "Querido Capital Fund 3": StrategyEnsemble({
-            "Mean Reversion": init_strat(
-                MeanReversionStrategy, EqualWeightAllocator, ["AAPL", "MSFT", "TSLA"],
-                {"lookback": 20, "bound": 2.0},
-                {},
-                1.0
-            ),
-        }),
-    }
+# The toolbar's date defaults, CacheWarmup precomputes the same range
+DEFAULT_START_DATE = datetime.date(2020, 1, 1)
+
+
+def default_end_date():
+    return datetime.date.today()
+
+
+def build_fund_registry(start, end):
+    """
+    Fund name -> StrategyEnsemble, read from the `funds` section of config.yaml. Funds are built lazily,
+    only the ones looked up pay for their data.
+    """
+    return FundRegistry(start, end)
 
 
 def render_global_toolbar(fund_registry):
@@ -100,16 +44,16 @@ def render_global_toolbar(fund_registry):
     with col1:
         st.selectbox("Fund", fund_list, key="fund")
     selected_fund = st.session_state.get("fund", fund_list[0])
-    strategy_list = list(fund_registry[selected_fund].capital_allocation.keys())
+    strategy_list = fund_registry.strategies(selected_fund)
     with col2:
         st.selectbox("Strategy", strategy_list, key="strategy")
 
     # Second row: Start & End Date
     col3, col4 = st.columns(2)
     with col3:
-        st.date_input("Start Date", value=datetime.date(2020, 1, 1), key="start_date")
+        st.date_input("Start Date", value=DEFAULT_START_DATE, key="start_date")
     with col4:
-        st.date_input("End Date", value=datetime.date.today(), key="end_date")
+        st.date_input("End Date", value=default_end_date(), key="end_date")
 
     st.markdown('</div>', unsafe_allow_html=True)
 